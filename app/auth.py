@@ -1,12 +1,17 @@
+import hashlib
+import hmac
 import os
+import time
 from typing import Optional, Dict, Any
 
-import httpx
-from cachetools import TTLCache
-from fastapi import Depends, HTTPException
+from cachetools import TLRUCache
+from fastapi import Depends, Header, HTTPException, Request
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
 from jose import jwt
 
+from app import metrics
+from app.jwks import JwksManager
+
 # -----------------------------
 # Config
 # -----------------------------
@@ -23,28 +28,72 @@ JWT_SECRET = os.getenv("SUPABASE_JWT_SECRET")  # legacy only
 # JWKS (preferred)
 JWKS_URL = os.getenv("SUPABASE_JWKS_URL", f"{JWT_ISSUER}/.well-known/jwks.json")
 
-# Cache JWKS for 1 hour
-_jwks_cache = TTLCache(maxsize=1, ttl=60 * 60)
+# Shared secret for operational endpoints (/admin/*). Unset = disabled.
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+# Verified claims per token (sha256), each entry lives until the token's exp.
+# The app reuses the same token for up to an hour, so repeat requests skip
+# header parsing, key lookup and signature verification entirely.
+CLAIMS_CACHE_SIZE = int(os.getenv("JWT_CLAIMS_CACHE_SIZE", "4096"))
+
+
+def _claims_ttu(_key: str, claims: Dict[str, Any], now: float) -> float:
+    return float(claims["exp"])
+
+
+_claims_cache = TLRUCache(maxsize=CLAIMS_CACHE_SIZE, ttu=_claims_ttu, timer=time.time)
+_claims_cache_stats = {"hits": 0, "misses": 0}
+
+# Parsed JWKS keys, valid 1 hour and refreshed in the background before that.
+# Signing keys rotated: drop every claim verified with the old set.
+_jwks = JwksManager(JWKS_URL, ttl_s=60 * 60, on_rotate=_claims_cache.clear)
 
 bearer_scheme = HTTPBearer(auto_error=False)
 
+# ASGI scope key carrying already-verified claims (see app.routes.batch)
+PREAUTH_SCOPE_KEY = "untapgo.user"
+
+
+def warm_jwks() -> None:
+    """Start fetching signing keys without blocking startup."""
+    _jwks.refresh_in_background()
+
 
-async def _get_jwks() -> Dict[str, Any]:
-    cached = _jwks_cache.get("jwks")
-    if cached:
-        return cached
+def claims_cache_stats() -> Dict[str, int]:
+    return {
+        "hits": _claims_cache_stats["hits"],
+        "misses": _claims_cache_stats["misses"],
+        "size": len(_claims_cache),
+        "maxsize": CLAIMS_CACHE_SIZE,
+    }
 
-    async with httpx.AsyncClient(timeout=10) as client:
-        r = await client.get(JWKS_URL)
-        r.raise_for_status()
-        jwks = r.json()
 
-    keys = jwks.get("keys") or []
-    if not keys:
-        raise RuntimeError("JWKS endpoint returned no keys")
+async def _verify_and_decode_cached(token: str) -> Dict[str, Any]:
+    t0 = metrics.now()
+    cache_key = hashlib.sha256(token.encode("utf-8")).hexdigest()
 
-    _jwks_cache["jwks"] = jwks
-    return jwks
+    cached = _claims_cache.get(cache_key)
+    if cached is not None:
+        _claims_cache_stats["hits"] += 1
+        metrics.jwt_verify.observe(metrics.now() - t0, "hit")
+        metrics.span("auth", metrics.now() - t0)
+        return dict(cached)
+
+    _claims_cache_stats["misses"] += 1
+    try:
+        claims = await _verify_and_decode(token)
+    except HTTPException:
+        metrics.jwt_verify.observe(metrics.now() - t0, "invalid")
+        metrics.span("auth", metrics.now() - t0)
+        raise
+    metrics.jwt_verify.observe(metrics.now() - t0, "miss")
+    metrics.span("auth", metrics.now() - t0)
+
+    # Only cache tokens that expire; TLRUCache skips already-expired entries
+    if isinstance(claims.get("exp"), (int, float)):
+        _claims_cache[cache_key] = dict(claims)
+
+    return claims
 
 
 async def _verify_and_decode(token: str) -> Dict[str, Any]:
@@ -58,13 +107,12 @@ async def _verify_and_decode(token: str) -> Dict[str, Any]:
 
     # Preferred: JWKS (Supabase, usually ES256)
     try:
-        jwks = await _get_jwks()
+        key = await _jwks.get_key(kid)
 
         if not kid:
             raise HTTPException(status_code=401, detail="Token missing kid")
 
-        key = next((k for k in jwks.get("keys", []) if k.get("kid") == kid), None)
-        if not key:
+        if key is None:
             raise HTTPException(status_code=401, detail="Unknown signing key")
 
         claims = jwt.decode(
@@ -98,6 +146,7 @@ async def _verify_and_decode(token: str) -> Dict[str, Any]:
 
 
 async def get_current_user(
+    request: Request,
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer_scheme),
 ) -> Dict[str, Any]:
     """
@@ -107,6 +156,12 @@ async def get_current_user(
     - dev (bool)
     """
 
+    # Sub-request of POST /batch: the batch already authenticated the caller.
+    # Only set in-process on the ASGI scope, never from client input.
+    preauth = request.scope.get(PREAUTH_SCOPE_KEY)
+    if preauth is not None:
+        return dict(preauth)
+
     dev_auth = os.getenv("DEV_AUTH", "0") == "1"
     dev_user_id = os.getenv("DEV_USER_ID")
 
@@ -127,7 +182,7 @@ async def get_current_user(
     # HTTPBearer YA elimina "Bearer "
     token = credentials.credentials
 
-    claims = await _verify_and_decode(token)
+    claims = await _verify_and_decode_cached(token)
 
     user_id = claims.get("sub")
     if not user_id:
@@ -139,3 +194,10 @@ async def get_current_user(
     claims["dev"] = False
 
     return claims
+
+
+def require_admin(x_admin_token: Optional[str] = Header(default=None)) -> None:
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail={"code": "ADMIN_REQUIRED"})
@@ -0,0 +1,104 @@
+import asyncio
+import gzip
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from app.config import CITIES_TTL_S
+from app.etag import etag_for
+from app.geo import batch_haversine_km
+from app.supabase_client import supabase_admin
+from app.supabase_user_client import execute
+
+logger = logging.getLogger("untapgo")
+
+
+class CitySnapshot:
+    """Active cities plus the /cities response, serialized and gzipped once."""
+
+    def __init__(self, rows: List[Dict[str, Any]]):
+        self.rows = rows
+        self.body = json.dumps(
+            {"cities": rows}, separators=(",", ":"), ensure_ascii=False, default=str
+        ).encode("utf-8")
+        # mtime=0 keeps the gzip bytes identical across reloads and instances
+        self.body_gzip = gzip.compress(self.body, compresslevel=6, mtime=0)
+        self.etag = etag_for(self.body)
+        # Strong validators differ per representation (RFC 9110 8.8.3)
+        self.etag_gzip = self.etag[:-1] + '-gz"'
+        self.loaded_at = time.monotonic()
+
+        self._lats = [r.get("center_lat") for r in rows]
+        self._lngs = [r.get("center_lng") for r in rows]
+
+    def city_at(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        """The city whose circle (center, radius_m) contains the point; nearest center wins."""
+        best: Optional[Dict[str, Any]] = None
+        best_km = float("inf")
+        for row, d in zip(self.rows, batch_haversine_km(lat, lng, self._lats, self._lngs)):
+            if d is None or row.get("radius_m") is None:
+                continue
+            if d * 1000.0 <= float(row["radius_m"]) and d < best_km:
+                best, best_km = row, d
+        return best
+
+
+class CityCatalog:
+    """
+    Active cities, loaded with the service role and reused for `ttl_s`.
+
+    Same shape as the other in-memory catalogs: single-flight reloads,
+    invalidate() for the admin hook, stale data served if a reload fails.
+    """
+
+    def __init__(self, ttl_s: float):
+        self.ttl_s = ttl_s
+        self._snap: Optional[CitySnapshot] = None
+        self._inflight: Optional["asyncio.Future[CitySnapshot]"] = None
+
+    def invalidate(self) -> None:
+        if self._snap is not None:
+            self._snap.loaded_at = float("-inf")
+
+    def warm(self) -> None:
+        asyncio.ensure_future(self.snapshot()).add_done_callback(_consume_exception)
+
+    async def snapshot(self) -> CitySnapshot:
+        snap = self._snap
+        if snap is not None and time.monotonic() - snap.loaded_at < self.ttl_s:
+            return snap
+
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._load())
+            self._inflight.add_done_callback(_consume_exception)
+        try:
+            # shield: a cancelled request must not cancel the shared load
+            return await asyncio.shield(self._inflight)
+        except Exception:
+            if snap is None:
+                raise
+            logger.warning("Cities reload failed, serving %d cached city(ies)", len(snap.rows))
+            return snap
+
+    async def city_at(self, lat: float, lng: float) -> Optional[Dict[str, Any]]:
+        return (await self.snapshot()).city_at(lat, lng)
+
+    async def _load(self) -> CitySnapshot:
+        res = await execute(
+            supabase_admin
+            .table("cities")
+            .select("id,name,center_lat,center_lng,radius_m")
+            .eq("is_active", True)
+            .order("name")
+        )
+        self._snap = CitySnapshot(res.data or [])
+        return self._snap
+
+
+def _consume_exception(fut: "asyncio.Future[Any]") -> None:
+    if not fut.cancelled():
+        fut.exception()
+
+
+cities = CityCatalog(ttl_s=CITIES_TTL_S)
@@ -0,0 +1,74 @@
+import asyncio
+import copy
+import json
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, TypeVar
+
+from app.config import COALESCE_READS, COALESCE_SHARED_RPCS
+from app.supabase_user_client import execute
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Concurrent calls with the same key share one in-flight coroutine.
+    Nothing is cached: the key is forgotten as soon as the call finishes.
+    Followers get a deep copy, so no caller can mutate another's result.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: Dict[Hashable, "asyncio.Future[Any]"] = {}
+        self._calls = 0
+        self._merged = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        fut = self._inflight.get(key)
+        if fut is not None:
+            self._merged += 1
+            # shield: a cancelled follower must not cancel the shared call
+            return copy.deepcopy(await asyncio.shield(fut))
+
+        self._calls += 1
+        fut = asyncio.ensure_future(fn())
+        self._inflight[key] = fut
+        fut.add_done_callback(lambda f: self._forget(key, f))
+        return await asyncio.shield(fut)
+
+    def _forget(self, key: Hashable, fut: "asyncio.Future[Any]") -> None:
+        if self._inflight.get(key) is fut:
+            del self._inflight[key]
+        if not fut.cancelled():
+            fut.exception()  # retrieved by the awaiting callers; silence the warning
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "upstream_calls": self._calls,
+            "merged": self._merged,
+            "in_flight": len(self._inflight),
+        }
+
+
+_reads = SingleFlight()
+
+
+def _scope(rpc: str, user: Optional[Dict[str, Any]]) -> str:
+    # user=None: service-role read, no per-user RLS to respect
+    if user is None or rpc in COALESCE_SHARED_RPCS:
+        return "shared"
+    # RLS / auth.uid() make the other results caller-specific
+    return "user:" + str(user.get("id"))
+
+
+async def read_rpc(supa, user: Optional[Dict[str, Any]], rpc: str, params: Dict[str, Any]):
+    """
+    execute(supa.rpc(rpc, params)), coalesced by (rpc, params, visibility scope).
+    Pass user=None only with the service-role client.
+    """
+    if not COALESCE_READS:
+        return await execute(supa.rpc(rpc, params))
+    key = (rpc, json.dumps(params, sort_keys=True, default=str), _scope(rpc, user))
+    return await _reads.do(key, lambda: execute(supa.rpc(rpc, params)))
+
+
+def coalesce_stats() -> Dict[str, int]:
+    return _reads.stats()
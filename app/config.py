@@ -18,3 +18,77 @@ if not SUPABASE_ANON_KEY:
 if not SUPABASE_SERVICE_ROLE_KEY:
     raise RuntimeError("SUPABASE_SERVICE_ROLE_KEY is missing in .env")
 
+# Shared PostgREST connection pool (user-scoped requests)
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "1") == "1"
+SUPABASE_TIMEOUT_S = float(os.getenv("SUPABASE_TIMEOUT_S", "10"))
+SUPABASE_POOL_MAX_CONNECTIONS = int(os.getenv("SUPABASE_POOL_MAX_CONNECTIONS", "50"))
+SUPABASE_POOL_MAX_KEEPALIVE = int(os.getenv("SUPABASE_POOL_MAX_KEEPALIVE", "20"))
+SUPABASE_POOL_KEEPALIVE_EXPIRY_S = float(os.getenv("SUPABASE_POOL_KEEPALIVE_EXPIRY_S", "60"))
+
+# "1" = async PostgREST client on the event loop, "0" = sync client in the threadpool
+SUPABASE_ASYNC = os.getenv("SUPABASE_ASYNC", "1") == "1"
+
+# Send lat/lng/radius to get_events_feed so Postgres prefilters /events/nearby
+# (needs the RPC to accept p_lat, p_lng, p_radius_km)
+FEED_RADIUS_PUSHDOWN = os.getenv("FEED_RADIUS_PUSHDOWN", "0") == "1"
+
+# Send keyset params (p_limit, p_after_starts_at, p_after_id) to the feed RPCs
+# (needs get_events_feed/get_events/get_my_events to accept them)
+FEED_KEYSET_PUSHDOWN = os.getenv("FEED_KEYSET_PUSHDOWN", "0") == "1"
+
+# Serve the event feed from a shared catalog cache plus a per-user membership
+# overlay instead of one get_events_feed call per user
+FEED_CATALOG_CACHE = os.getenv("FEED_CATALOG_CACHE", "0") == "1"
+FEED_CATALOG_TTL_S = float(os.getenv("FEED_CATALOG_TTL_S", "15"))
+
+# Background jobs (notification side effects), persisted in a local SQLite file.
+# In production JOBS_DB_PATH must point at a persistent volume (fly.toml mounts
+# one at /data); the default is only for local runs.
+JOBS_ENABLED = os.getenv("JOBS_ENABLED", "1") == "1"
+JOBS_DB_PATH = os.getenv("JOBS_DB_PATH", "var/jobs.sqlite3")
+JOBS_WORKERS = int(os.getenv("JOBS_WORKERS", "4"))
+
+# /cities: in-memory list, reloaded after CITIES_TTL_S; clients may cache CITIES_MAX_AGE_S
+CITIES_TTL_S = float(os.getenv("CITIES_TTL_S", "3600"))
+CITIES_MAX_AGE_S = int(os.getenv("CITIES_MAX_AGE_S", "3600"))
+
+# Assembled public profiles (GET /profiles/{id}), per user id
+PROFILE_CACHE_TTL_S = float(os.getenv("PROFILE_CACHE_TTL_S", "30"))
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "2048"))
+
+# Per-user unread notification counter kept in memory; re-counted after the TTL.
+# Keep it short: the app marks rows read straight in Supabase, and other
+# machines / the database itself insert notifications this process never sees.
+UNREAD_COUNT_TTL_S = float(os.getenv("UNREAD_COUNT_TTL_S", "5"))
+UNREAD_COUNT_CACHE_SIZE = int(os.getenv("UNREAD_COUNT_CACHE_SIZE", "10000"))
+
+# GET /notifications/stream (SSE)
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "5000"))
+SSE_MAX_PER_USER = int(os.getenv("SSE_MAX_PER_USER", "4"))
+SSE_PING_S = float(os.getenv("SSE_PING_S", "25"))
+
+# "1" = run response_model validation on feed responses (tests / debugging).
+# "0" = feed routes send their already-mapped rows straight to the JSON encoder.
+STRICT_RESPONSE_VALIDATION = os.getenv("STRICT_RESPONSE_VALIDATION", "0") == "1"
+
+# Identical concurrent read RPCs share one upstream call. Results are shared
+# per caller unless the RPC is listed here as returning the same rows for
+# every authenticated user (no per-user RLS / auth.uid() dependence).
+# Empty by default: only list an RPC once its SQL is confirmed to ignore the
+# caller. Caller-specific, so never listed: get_event (is_joined, my_status,
+# cooldown_seconds, host-only pending count) and get_event_requests (host only).
+COALESCE_READS = os.getenv("COALESCE_READS", "1") == "1"
+COALESCE_SHARED_RPCS = frozenset(
+    s.strip()
+    for s in os.getenv("COALESCE_SHARED_RPCS", "").split(",")
+    if s.strip()
+)
+
+# GET /metrics (Prometheus): 404 unless set; scrapers send "Authorization: Bearer <token>".
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Server-Timing on every response ("1"), or only when the request sends
+# X-Server-Timing: <ADMIN_TOKEN>. Requests slower than SLOW_REQUEST_MS are
+# kept for GET /admin/slow_requests.
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "1000"))
@@ -2,3 +2,10 @@
 
 HOST_NOTES_MAX = 2800
 HOST_NOTES_PREVIEW_MAX = 280
+
+# Feed pagination (limit / cursor)
+FEED_PAGE_DEFAULT = 50
+FEED_PAGE_MAX = 200
+
+# POST /batch
+BATCH_MAX_ITEMS = 10
@@ -0,0 +1,115 @@
+import hashlib
+from typing import Iterable, List, Optional, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Responses bigger than this are passed through untouched
+ETAG_MAX_BODY = 8 * 1024 * 1024
+
+
+def etag_for(body: bytes) -> str:
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*":
+            return True
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag == etag:
+            return True
+    return False
+
+
+def _header(headers: Iterable[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for k, v in headers:
+        if k.lower() == name:
+            return v
+    return None
+
+
+class ETagMiddleware:
+    """
+    Strong ETag for every 200 JSON response to GET, computed from the
+    body bytes the route already produced, and 304 Not Modified when the
+    client's If-None-Match matches. Streaming / non-JSON responses and routes
+    that set their own ETag pass through unchanged.
+    """
+
+    def __init__(self, app: ASGIApp, max_body: int = ETAG_MAX_BODY):
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = _header(scope["headers"], b"if-none-match")
+        start: Optional[Message] = None
+        chunks: List[bytes] = []
+        size = 0
+        passthrough = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal start, size, passthrough
+
+            if message["type"] == "http.response.start":
+                headers = message.get("headers", [])
+                ctype = _header(headers, b"content-type") or b""
+                if (
+                    message["status"] != 200
+                    or not ctype.startswith(b"application/json")
+                    or _header(headers, b"etag") is not None
+                ):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            chunks.append(body)
+            size += len(body)
+
+            if size > self.max_body:
+                # Too big to buffer: flush what we have and stream the rest
+                passthrough = True
+                await send(start)
+                await send({**message, "body": b"".join(chunks)})
+                return
+
+            if message.get("more_body", False):
+                return
+
+            await self._finish(start, b"".join(chunks), if_none_match, send)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _finish(self, start: Message, body: bytes, if_none_match: Optional[bytes], send: Send) -> None:
+        etag = etag_for(body)
+        headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"content-length"]
+        headers.append((b"etag", etag.encode("latin-1")))
+        if _header(headers, b"cache-control") is None:
+            # Let the app keep a copy but always revalidate
+            headers.append((b"cache-control", b"private, no-cache"))
+
+        if etag_matches(if_none_match.decode("latin-1") if if_none_match else None, etag):
+            # A 304 repeats the 200's Cache-Control / Vary / ETag (RFC 9110 15.4.5)
+            keep = [(k, v) for k, v in headers if k.lower() != b"content-type"]
+            await send({"type": "http.response.start", "status": 304, "headers": keep})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        headers.append((b"content-length", str(len(body)).encode("latin-1")))
+
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,168 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.geo import GridIndex
+
+logger = logging.getLogger("untapgo")
+
+# How many per-event changes /events/changes can replay before forcing a reset
+CHANGE_LOG_SIZE = 20_000
+
+
+def _consume_exception(fut: "asyncio.Future[Any]") -> None:
+    # Superseded loads may finish with nobody awaiting them
+    if not fut.cancelled():
+        fut.exception()
+
+
+def _row_digest(row: Dict[str, Any]) -> bytes:
+    raw = json.dumps(row, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=12).digest()
+
+
+class CatalogSnapshot:
+    """
+    One immutable load of the public event catalog.
+    `rows` / `by_id` / `index` only hold visible rows; `hidden` keeps the rest
+    (e.g. Cancelled) so deltas can say why an event left the feed.
+    """
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        is_visible: Callable[[Dict[str, Any]], bool],
+        generation: int,
+        version: int,
+    ):
+        self.rows: List[Dict[str, Any]] = []
+        self.hidden: Dict[str, Dict[str, Any]] = {}
+        for r in rows:
+            if is_visible(r):
+                self.rows.append(r)
+            else:
+                self.hidden[str(r.get("id"))] = r
+
+        self.by_id: Dict[str, Dict[str, Any]] = {str(r.get("id")): r for r in self.rows}
+        self.digests: Dict[str, bytes] = {
+            str(r.get("id")): _row_digest(r) for r in rows
+        }
+        self.index = GridIndex.from_rows(self.rows)
+        self.generation = generation
+        self.version = version
+        self.seq = 0  # change-log position this snapshot reflects
+        self.loaded_at = time.monotonic()
+
+
+class EventCatalog:
+    """
+    Process-wide cache of the event rows every user shares (title, format,
+    location, counts, status). Per-user fields are merged in by the caller.
+
+    - Reloaded at most every `ttl_s` seconds, one in-flight load at a time.
+    - invalidate() (called by the mutation routes) makes the next read reload,
+      even if a load that started earlier is still running.
+    - Every reload is diffed against the previous one into a bounded change
+      log (seq -> event id) that powers delta sync.
+    """
+
+    def __init__(
+        self,
+        loader: Callable[[], Awaitable[List[Dict[str, Any]]]],
+        ttl_s: float = 15,
+        is_visible: Callable[[Dict[str, Any]], bool] = lambda _row: True,
+    ):
+        self._loader = loader
+        self._is_visible = is_visible
+        self.ttl_s = ttl_s
+
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._generation = 0
+        self._version = 0
+        self._inflight: Optional["asyncio.Future[CatalogSnapshot]"] = None
+        self._inflight_generation = -1
+
+        # Sync tokens from another process (or before a restart) are unusable
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._changes: Deque[Tuple[int, str]] = deque(maxlen=CHANGE_LOG_SIZE)
+
+    def invalidate(self) -> None:
+        self._generation += 1
+
+    def _is_fresh(self, snap: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snap is not None
+            and snap.generation == self._generation
+            and time.monotonic() - snap.loaded_at < self.ttl_s
+        )
+
+    def peek(self, event_id: str) -> Optional[Dict[str, Any]]:
+        """Row from whatever snapshot is loaded (maybe stale); never triggers a load."""
+        snap = self._snapshot
+        if snap is None:
+            return None
+        return snap.by_id.get(event_id) or snap.hidden.get(event_id)
+
+    async def snapshot(self) -> CatalogSnapshot:
+        snap = self._snapshot
+        if self._is_fresh(snap):
+            return snap
+
+        # A load started before the last invalidate() can't satisfy this read
+        if (
+            self._inflight is None
+            or self._inflight.done()
+            or self._inflight_generation != self._generation
+        ):
+            self._inflight_generation = self._generation
+            self._inflight = asyncio.ensure_future(self._load(self._generation))
+            self._inflight.add_done_callback(_consume_exception)
+
+        try:
+            return await asyncio.shield(self._inflight)
+        except Exception:
+            if self._snapshot is None:
+                raise
+            logger.warning("Event catalog reload failed, serving previous snapshot")
+            return self._snapshot
+
+    async def _load(self, generation: int) -> CatalogSnapshot:
+        rows = await self._loader()
+        self._version += 1
+        snap = CatalogSnapshot(rows, self._is_visible, generation, self._version)
+
+        # An older load finishing late must not replace a newer snapshot
+        current = self._snapshot
+        if current is None or current.generation <= generation:
+            self._record_changes(current, snap)
+            snap.seq = self.seq
+            self._snapshot = snap
+        return snap
+
+    def _record_changes(self, old: Optional[CatalogSnapshot], new: CatalogSnapshot) -> None:
+        if old is None:
+            return
+        changed = [i for i, d in new.digests.items() if old.digests.get(i) != d]
+        changed.extend(i for i in old.digests if i not in new.digests)
+        for event_id in changed:
+            self.seq += 1
+            self._changes.append((self.seq, event_id))
+
+    def changes_since(self, seq: int, upto: int) -> Optional[Set[str]]:
+        """
+        Event ids changed in (seq, upto], or None when the log no longer
+        reaches back that far (the caller must resync from scratch).
+        """
+        if seq > upto:
+            return None
+        if seq == upto:
+            return set()
+        if not self._changes or self._changes[0][0] > seq + 1:
+            return None
+        return {event_id for s, event_id in self._changes if seq < s <= upto}
@@ -0,0 +1,111 @@
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+from app.supabase_client import supabase_admin
+from app.supabase_user_client import execute
+
+logger = logging.getLogger("untapgo")
+
+
+def normalize_slug(v: Optional[str]) -> Optional[str]:
+    if v is None:
+        return None
+    s = str(v).strip().lower()
+    return s if s else None
+
+
+class FormatRegistry:
+    """
+    slug -> formats.id, loaded once with the service role and kept in memory.
+
+    - Formats almost never change, so lookups don't hit Supabase.
+    - Reloaded in the background after `ttl_s`, or right away via refresh()
+      (POST /admin/formats/refresh).
+    - An unknown slug triggers at most one reload per `unknown_slug_interval_s`,
+      so a newly added format works without waiting for the TTL.
+    - A failed reload keeps serving the last good map.
+    """
+
+    def __init__(self, ttl_s: float = 60 * 60, unknown_slug_interval_s: float = 30):
+        self.ttl_s = ttl_s
+        self.unknown_slug_interval_s = unknown_slug_interval_s
+
+        self._ids: Dict[str, int] = {}
+        self._loaded_at = 0.0
+        self._last_unknown_fetch = 0.0
+        self._inflight: Optional["asyncio.Future[None]"] = None
+
+    @property
+    def slugs(self) -> Dict[str, int]:
+        return dict(self._ids)
+
+    async def id_for(self, slug: Optional[str]) -> Optional[int]:
+        s = normalize_slug(slug)
+
+        if not self._ids:
+            await self._reload()
+        elif time.monotonic() - self._loaded_at >= self.ttl_s:
+            self._start_fetch().add_done_callback(self._log_background_error)
+
+        if s is None:
+            return None
+
+        fid = self._ids.get(s)
+        if fid is None:
+            now = time.monotonic()
+            if now - self._last_unknown_fetch >= self.unknown_slug_interval_s:
+                self._last_unknown_fetch = now
+                await self._reload()
+                fid = self._ids.get(s)
+        return fid
+
+    async def is_valid(self, slug: Optional[str]) -> bool:
+        return await self.id_for(slug) is not None
+
+    async def refresh(self) -> int:
+        """Reload now (admin hook). Returns the number of formats loaded."""
+        await asyncio.shield(self._start_fetch())
+        return len(self._ids)
+
+    def warm(self) -> None:
+        self._start_fetch().add_done_callback(self._log_background_error)
+
+    async def _reload(self) -> None:
+        try:
+            # shield: a cancelled request must not cancel the shared fetch
+            await asyncio.shield(self._start_fetch())
+        except Exception:
+            if not self._ids:
+                raise
+            logger.warning("Formats reload failed, keeping %d cached format(s)", len(self._ids))
+
+    def _start_fetch(self) -> "asyncio.Future[None]":
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        return self._inflight
+
+    async def _fetch(self) -> None:
+        r = await execute(supabase_admin.table("formats").select("id,slug"))
+        ids: Dict[str, int] = {}
+        for row in r.data or []:
+            s = normalize_slug(row.get("slug"))
+            if s and row.get("id") is not None:
+                ids[s] = int(row["id"])
+        if not ids:
+            raise RuntimeError("formats table returned no rows")
+
+        self._ids = ids
+        self._loaded_at = time.monotonic()
+
+    @staticmethod
+    def _log_background_error(fut: "asyncio.Future[None]") -> None:
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            logger.warning("Background formats reload failed: %s", exc)
+
+
+formats = FormatRegistry()
@@ -0,0 +1,243 @@
+import heapq
+import math
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+# NumPy is imported on first use (or by preload() after startup), not at import:
+# it is most of this module's import cost and only the batch paths need it
+_np: Any = None  # module once loaded, False when not installed
+
+EARTH_RADIUS_KM = 6371.0
+KM_PER_DEG_LAT = math.pi * EARTH_RADIUS_KM / 180.0
+
+
+def haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
+    r = EARTH_RADIUS_KM
+    phi1 = math.radians(lat1)
+    phi2 = math.radians(lat2)
+    dphi = math.radians(lat2 - lat1)
+    dlambda = math.radians(lng2 - lng1)
+
+    a = (math.sin(dphi / 2) ** 2) + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
+    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    return r * c
+
+
+def _to_float(v: Any) -> Optional[float]:
+    if v is None:
+        return None
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        return None
+    return None if math.isnan(f) else f
+
+
+def _batch_haversine_py(lat: float, lng: float, lats: Sequence[Any], lngs: Sequence[Any]) -> List[Optional[float]]:
+    # Same math as haversine_km, with the origin terms hoisted out of the loop
+    r2 = 2 * EARTH_RADIUS_KM
+    phi1 = math.radians(lat)
+    cos_phi1 = math.cos(phi1)
+    rad = math.radians
+    sin = math.sin
+    cos = math.cos
+    asin = math.asin
+    sqrt = math.sqrt
+
+    out: List[Optional[float]] = []
+    append = out.append
+    for la, ln in zip(lats, lngs):
+        try:
+            phi2 = rad(la)
+            dl = rad(ln - lng)
+        except TypeError:
+            # None, or numeric strings from PostgREST numeric columns
+            la = _to_float(la)
+            ln = _to_float(ln)
+            if la is None or ln is None:
+                append(None)
+                continue
+            phi2 = rad(la)
+            dl = rad(ln - lng)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin(dl / 2) ** 2
+        if a > 1.0:
+            a = 1.0
+        elif a != a:  # NaN coordinate
+            append(None)
+            continue
+        append(r2 * asin(sqrt(a)))
+    return out
+
+
+def _numpy() -> Any:
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:  # pure-Python fallback below
+            _np = False
+        else:
+            _np = numpy
+    return _np or None
+
+
+def preload() -> bool:
+    """Import NumPy now, off the request path. False when it is not installed."""
+    return _numpy() is not None
+
+
+def _as_float_array(np: Any, col: Sequence[Any]):
+    try:
+        return np.asarray(col, dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([_to_float(v) for v in col], dtype=np.float64)
+
+
+def batch_haversine_km(lat: float, lng: float, lats: Sequence[Any], lngs: Sequence[Any]) -> List[Optional[float]]:
+    """
+    Great-circle distance from (lat, lng) to every (lats[i], lngs[i]) in one
+    call. Missing or non-numeric coordinates give None at that position.
+    Uses NumPy when installed, a tight pure-Python loop otherwise.
+    """
+    np = _numpy() if lats else None
+    if np is None:
+        return _batch_haversine_py(lat, lng, lats, lngs)
+
+    la = np.radians(_as_float_array(np, lats))
+    ln = np.radians(_as_float_array(np, lngs))
+    phi1 = math.radians(lat)
+
+    a = np.sin((la - phi1) / 2) ** 2 + math.cos(phi1) * np.cos(la) * np.sin((ln - math.radians(lng)) / 2) ** 2
+    d = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    return [None if x != x else x for x in d.tolist()]
+
+
+def radius_argsort(distances: Sequence[Optional[float]], radius_km: Optional[float] = None, k: Optional[int] = None) -> List[int]:
+    """
+    Indices of `distances` within radius_km (None entries never match),
+    closest first, at most k of them.
+    """
+    if k is not None and k <= 0:
+        return []
+
+    np = _numpy() if distances else None
+    if np is not None:
+        d = np.array(distances, dtype=np.float64)  # None -> NaN
+        mask = ~np.isnan(d)
+        if radius_km is not None:
+            mask &= d <= radius_km
+        idx = np.nonzero(mask)[0]
+        if k is not None and k < len(idx):
+            idx = idx[np.argpartition(d[idx], k - 1)[:k]]
+        return idx[np.argsort(d[idx], kind="stable")].tolist()
+
+    hits = [
+        i for i, x in enumerate(distances)
+        if x is not None and (radius_km is None or x <= radius_km)
+    ]
+    if k is not None and k < len(hits):
+        return heapq.nsmallest(k, hits, key=lambda i: distances[i])
+    hits.sort(key=lambda i: distances[i])
+    return hits
+
+
+def bounding_box(lat: float, lng: float, radius_km: float) -> Tuple[float, float, float, float]:
+    """
+    (min_lat, max_lat, min_lng, max_lng) containing every point within
+    radius_km. Longitudes may run past +-180; callers wrap them.
+    """
+    dlat = radius_km / KM_PER_DEG_LAT
+    min_lat = max(-90.0, lat - dlat)
+    max_lat = min(90.0, lat + dlat)
+
+    # Near a pole the circle covers every longitude
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat <= 1e-9 or dlat / cos_lat >= 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+
+    dlng = dlat / cos_lat
+    return min_lat, max_lat, lng - dlng, lng + dlng
+
+
+def _coords(row: Dict[str, Any]) -> Optional[Tuple[float, float]]:
+    lat = row.get("lat")
+    lng = row.get("lng")
+    if lat is None or lng is None:
+        return None
+    try:
+        return float(lat), float(lng)
+    except (TypeError, ValueError):
+        return None
+
+
+class GridIndex:
+    """
+    Fixed lat/lng grid over (lat, lng, item) points.
+
+    A radius query only visits the cells overlapping the circle's bounding
+    box and runs haversine on those candidates, instead of on every point.
+    """
+
+    def __init__(self, cell_deg: float = 0.5):
+        self.cell_deg = cell_deg
+        self._lng_cells = int(math.ceil(360.0 / cell_deg))
+        self._cells: Dict[Tuple[int, int], List[Tuple[float, float, Any]]] = {}
+        self._size = 0
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], cell_deg: float = 0.5) -> "GridIndex":
+        """Index dict rows by their lat/lng; rows without usable coords are skipped."""
+        index = cls(cell_deg)
+        for row in rows:
+            c = _coords(row)
+            if c is not None:
+                index.add(c[0], c[1], row)
+        return index
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _lat_cell(self, lat: float) -> int:
+        return int(math.floor((lat + 90.0) / self.cell_deg))
+
+    def _lng_cell(self, lng: float) -> int:
+        return int(math.floor((lng + 180.0) / self.cell_deg)) % self._lng_cells
+
+    def add(self, lat: float, lng: float, item: Any) -> None:
+        key = (self._lat_cell(lat), self._lng_cell(lng))
+        self._cells.setdefault(key, []).append((lat, lng, item))
+        self._size += 1
+
+    def _cells_in_box(self, min_lat: float, max_lat: float, min_lng: float, max_lng: float) -> Iterator[List[Tuple[float, float, Any]]]:
+        lat_lo, lat_hi = self._lat_cell(min_lat), self._lat_cell(max_lat)
+
+        lng_lo = int(math.floor((min_lng + 180.0) / self.cell_deg))
+        lng_hi = int(math.floor((max_lng + 180.0) / self.cell_deg))
+        if lng_hi - lng_lo + 1 >= self._lng_cells:
+            lng_keys = range(self._lng_cells)
+        else:
+            lng_keys = sorted({i % self._lng_cells for i in range(lng_lo, lng_hi + 1)})
+
+        for i in range(lat_lo, lat_hi + 1):
+            for j in lng_keys:
+                bucket = self._cells.get((i, j))
+                if bucket:
+                    yield bucket
+
+    def _candidates(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, float, Any]]:
+        out: List[Tuple[float, float, Any]] = []
+        for bucket in self._cells_in_box(*bounding_box(lat, lng, radius_km)):
+            out.extend(bucket)
+        return out
+
+    def within(self, lat: float, lng: float, radius_km: float) -> List[Tuple[float, Any]]:
+        """Unordered (distance_km, item) pairs within radius_km."""
+        cands = self._candidates(lat, lng, radius_km)
+        dists = batch_haversine_km(lat, lng, [c[0] for c in cands], [c[1] for c in cands])
+        return [(d, c[2]) for d, c in zip(dists, cands) if d is not None and d <= radius_km]
+
+    def nearest(self, lat: float, lng: float, radius_km: float, k: Optional[int] = None) -> List[Tuple[float, Any]]:
+        """(distance_km, item) pairs within radius_km, closest first, at most k."""
+        cands = self._candidates(lat, lng, radius_km)
+        dists = batch_haversine_km(lat, lng, [c[0] for c in cands], [c[1] for c in cands])
+        return [(dists[i], cands[i][2]) for i in radius_argsort(dists, radius_km, k)]
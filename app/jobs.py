@@ -0,0 +1,266 @@
+import asyncio
+import json
+import logging
+import os
+import random
+import sqlite3
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from app import metrics
+from app.config import JOBS_DB_PATH, JOBS_WORKERS
+
+logger = logging.getLogger("untapgo")
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str) -> Callable[[JobHandler], JobHandler]:
+    """
+    Register the coroutine that runs jobs of `kind`.
+
+    A handler that fails part-way may narrow `payload` in place before raising
+    (e.g. drop recipients already notified); the retry runs with that payload.
+    """
+    def deco(fn: JobHandler) -> JobHandler:
+        _handlers[kind] = fn
+        return fn
+    return deco
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind        TEXT    NOT NULL,
+    payload     TEXT    NOT NULL,
+    status      TEXT    NOT NULL DEFAULT 'queued',  -- queued | running | dead
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    run_at      REAL    NOT NULL,
+    created_at  REAL    NOT NULL,
+    last_error  TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_due ON jobs (status, run_at);
+"""
+
+
+class JobQueue:
+    """
+    Local persistent job queue (SQLite, WAL) drained by asyncio workers.
+
+    - enqueue() is one small local write, so routes return right away and a
+      restart mid-way doesn't lose the side effect (running jobs are requeued).
+    - Failed jobs retry with exponential backoff + jitter; after
+      `max_attempts` they are kept as 'dead' for inspection.
+    - All SQLite access happens on the event loop thread, so claiming a job
+      needs no extra locking. Callers of stats() (/admin/stats, /metrics) must be
+      `async def` routes, not threadpool ones.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = 4,
+        max_attempts: int = 6,
+        backoff_base_s: float = 2.0,
+        backoff_max_s: float = 300.0,
+    ):
+        self.path = path
+        self.workers = workers
+        self.max_attempts = max_attempts
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        self._db: Optional[sqlite3.Connection] = None
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._wakeup: Optional[asyncio.Event] = None
+
+        self._done = 0
+        self._retried = 0
+        self._dead = 0
+        self._latencies_ms: Deque[float] = deque(maxlen=1000)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    # ---------------- lifecycle ----------------
+
+    def start(self) -> None:
+        if self._tasks:
+            return
+        d = os.path.dirname(self.path)
+        if d:
+            os.makedirs(d, exist_ok=True)
+
+        self._db = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(_SCHEMA)
+        # Jobs that were mid-flight when the process died run again
+        self._db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+
+        self._wakeup = asyncio.Event()
+        self._tasks = [asyncio.ensure_future(self._worker(i)) for i in range(self.workers)]
+
+    async def stop(self) -> None:
+        for t in self._tasks:
+            t.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        if self._db is not None:
+            # Jobs interrupted by shutdown are picked up on next start
+            self._db.execute("UPDATE jobs SET status = 'queued' WHERE status = 'running'")
+            self._db.close()
+            self._db = None
+
+    # ---------------- producer ----------------
+
+    async def enqueue(self, kind: str, payload: Dict[str, Any], delay_s: float = 0) -> None:
+        if kind not in _handlers:
+            raise ValueError(f"No job handler for {kind!r}")
+
+        if self._db is None:
+            # Queue not running (tests / JOBS_ENABLED=0): run inline, best effort
+            try:
+                await _handlers[kind](payload)
+            except Exception:
+                logger.exception("Inline job %s failed", kind)
+            return
+
+        t0 = metrics.now()
+        now = time.time()
+        self._db.execute(
+            "INSERT INTO jobs (kind, payload, run_at, created_at) VALUES (?, ?, ?, ?)",
+            (kind, json.dumps(payload, default=str), now + delay_s, now),
+        )
+        self._wakeup.set()
+        metrics.span(f"enqueue:{kind}", metrics.now() - t0)
+
+    # ---------------- consumer ----------------
+
+    def _claim(self) -> Optional[sqlite3.Row]:
+        row = self._db.execute(
+            "SELECT id, kind, payload, attempts, created_at FROM jobs "
+            "WHERE status = 'queued' AND run_at <= ? ORDER BY run_at, id LIMIT 1",
+            (time.time(),),
+        ).fetchone()
+        if row is not None:
+            self._db.execute("UPDATE jobs SET status = 'running' WHERE id = ?", (row[0],))
+        return row
+
+    def _next_due_in(self) -> float:
+        row = self._db.execute(
+            "SELECT MIN(run_at) FROM jobs WHERE status = 'queued'"
+        ).fetchone()
+        if not row or row[0] is None:
+            return 30.0
+        return max(0.05, min(30.0, row[0] - time.time()))
+
+    async def _worker(self, n: int) -> None:
+        while True:
+            try:
+                await self._step()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # e.g. database locked / disk full: keep the worker alive and back off
+                logger.exception("Job worker %d failed, continuing", n)
+                await asyncio.sleep(1.0)
+
+    async def _step(self) -> None:
+        row = self._claim()
+        if row is None:
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self._next_due_in())
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        job_id, kind, raw, attempts, created_at = row
+        payload: Optional[Dict[str, Any]] = None
+        try:
+            payload = json.loads(raw)
+            await _handlers[kind](payload)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._fail(job_id, kind, payload, attempts + 1, e)
+            return
+
+        self._db.execute("DELETE FROM jobs WHERE id = ?", (job_id,))
+        self._done += 1
+        self._latencies_ms.append((time.time() - created_at) * 1000.0)
+
+    def _fail(
+        self,
+        job_id: int,
+        kind: str,
+        payload: Optional[Dict[str, Any]],
+        attempts: int,
+        exc: Exception,
+    ) -> None:
+        err = f"{type(exc).__name__}: {exc}"[:1000]
+        # Keep the stored payload when there is no usable narrowed one
+        raw: Optional[str] = None
+        if payload is not None:
+            try:
+                raw = json.dumps(payload, default=str)
+            except Exception:
+                logger.warning("Job %s #%d payload not serializable, keeping the stored one", kind, job_id)
+
+        if attempts >= self.max_attempts:
+            self._dead += 1
+            logger.error("Job %s #%d dead after %d attempts: %s", kind, job_id, attempts, err)
+            self._db.execute(
+                "UPDATE jobs SET status = 'dead', attempts = ?, payload = COALESCE(?, payload), last_error = ? "
+                "WHERE id = ?",
+                (attempts, raw, err, job_id),
+            )
+            return
+
+        self._retried += 1
+        delay = min(self.backoff_max_s, self.backoff_base_s * (2 ** (attempts - 1)))
+        delay *= random.uniform(0.5, 1.0)
+        logger.warning("Job %s #%d failed (attempt %d), retry in %.1fs: %s", kind, job_id, attempts, delay, err)
+        self._db.execute(
+            "UPDATE jobs SET status = 'queued', attempts = ?, payload = COALESCE(?, payload), run_at = ?, "
+            "last_error = ? WHERE id = ?",
+            (attempts, raw, time.time() + delay, err, job_id),
+        )
+        # Idle workers re-compute how long to sleep
+        self._wakeup.set()
+
+    # ---------------- metrics ----------------
+
+    def stats(self) -> Dict[str, Any]:
+        counts = {"queued": 0, "running": 0, "dead": 0}
+        if self._db is not None:
+            for status, n in self._db.execute("SELECT status, COUNT(*) FROM jobs GROUP BY status"):
+                counts[status] = n
+
+        lat = sorted(self._latencies_ms)
+
+        def pct(p: float) -> Optional[float]:
+            if not lat:
+                return None
+            return round(lat[min(len(lat) - 1, int(p * len(lat)))], 1)
+
+        return {
+            "running": self.running,
+            "depth": counts["queued"],
+            "in_flight": counts["running"],
+            "dead_letter": counts["dead"],
+            "done_total": self._done,
+            "retried_total": self._retried,
+            "dead_total": self._dead,
+            "latency_ms_p50": pct(0.50),
+            "latency_ms_p95": pct(0.95),
+            "latency_ms_max": round(lat[-1], 1) if lat else None,
+        }
+
+
+queue = JobQueue(JOBS_DB_PATH, workers=JOBS_WORKERS)
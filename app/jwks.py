@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Optional
+
+import httpx
+from jose import jwk
+
+logger = logging.getLogger("untapgo")
+
+# alg to use when a JWK does not carry one
+_DEFAULT_ALG_BY_KTY = {"EC": "ES256", "RSA": "RS256", "oct": "HS256"}
+
+
+class JwksManager:
+    """
+    kid -> ready-to-use jose key, fetched from a JWKS endpoint.
+
+    - Keys are parsed once per fetch, not once per request.
+    - Close to expiry the set is refreshed in the background while the
+      current keys keep serving requests.
+    - Concurrent refreshes share one in-flight fetch (single-flight).
+    - An unknown kid triggers at most one refetch per `unknown_kid_interval_s`.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        ttl_s: float = 60 * 60,
+        refresh_ahead_s: float = 5 * 60,
+        unknown_kid_interval_s: float = 30,
+        on_rotate: Optional[Callable[[], None]] = None,
+    ):
+        self.url = url
+        self.ttl_s = ttl_s
+        self.refresh_ahead_s = refresh_ahead_s
+        self.unknown_kid_interval_s = unknown_kid_interval_s
+        self._on_rotate = on_rotate
+
+        self._keys: Dict[str, Any] = {}
+        self._fetched_at = 0.0
+        self._last_unknown_kid_fetch = 0.0
+        self._inflight: Optional["asyncio.Future[None]"] = None
+
+    async def get_key(self, kid: Optional[str]) -> Optional[Any]:
+        age = time.monotonic() - self._fetched_at
+
+        if not self._keys or age >= self.ttl_s:
+            await self._refresh()
+        elif age >= self.ttl_s - self.refresh_ahead_s:
+            self.refresh_in_background()
+
+        if not kid:
+            return None
+
+        key = self._keys.get(kid)
+        if key is None:
+            now = time.monotonic()
+            if now - self._last_unknown_kid_fetch >= self.unknown_kid_interval_s:
+                self._last_unknown_kid_fetch = now
+                await self._refresh()
+                key = self._keys.get(kid)
+        return key
+
+    def refresh_in_background(self) -> None:
+        fut = self._start_fetch()
+        fut.add_done_callback(self._log_background_error)
+
+    async def _refresh(self) -> None:
+        try:
+            # shield: a cancelled request must not cancel the shared fetch
+            await asyncio.shield(self._start_fetch())
+        except Exception:
+            if not self._keys:
+                raise
+            # Stale keys beat no keys while the endpoint is flaky
+            logger.warning("JWKS refresh failed, keeping %d cached key(s)", len(self._keys))
+
+    def _start_fetch(self) -> "asyncio.Future[None]":
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._fetch())
+        return self._inflight
+
+    async def _fetch(self) -> None:
+        async with httpx.AsyncClient(timeout=10) as client:
+            r = await client.get(self.url)
+            r.raise_for_status()
+            jwks = r.json()
+        self._install(jwks)
+
+    def seed(self, jwks: Dict[str, Any]) -> None:
+        """Use a JWKS document without fetching it (offline runs, bench/)."""
+        self._install(jwks)
+
+    def _install(self, jwks: Dict[str, Any]) -> None:
+        raw_keys = jwks.get("keys") or []
+        if not raw_keys:
+            raise RuntimeError("JWKS endpoint returned no keys")
+
+        keys: Dict[str, Any] = {}
+        for k in raw_keys:
+            kid = k.get("kid")
+            if not kid:
+                continue
+            try:
+                keys[kid] = jwk.construct(k, k.get("alg") or _DEFAULT_ALG_BY_KTY.get(k.get("kty")))
+            except Exception:
+                logger.warning("Skipping unusable JWKS key kid=%s", kid)
+
+        if not keys:
+            raise RuntimeError("JWKS endpoint returned no usable keys")
+
+        rotated = bool(self._keys) and set(keys) != set(self._keys)
+
+        self._keys = keys
+        self._fetched_at = time.monotonic()
+
+        if rotated and self._on_rotate is not None:
+            self._on_rotate()
+
+    @staticmethod
+    def _log_background_error(fut: "asyncio.Future[None]") -> None:
+        if fut.cancelled():
+            return
+        exc = fut.exception()
+        if exc is not None:
+            logger.warning("Background JWKS refresh failed: %s", exc)
@@ -1,18 +1,89 @@
+import time
+
+_import_started = time.perf_counter()
+
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 import logging
 
+from app import geo, jobs
+from app.auth import ADMIN_TOKEN, warm_jwks
+from app.city_catalog import cities
+from app.config import JOBS_ENABLED, SERVER_TIMING, SLOW_REQUEST_MS
+from app.etag import ETagMiddleware
+from app.formats import formats
+from app.metrics import MetricsMiddleware
+from app.routes.admin import router as admin_router
+from app.routes.batch import router as batch_router
 from app.routes.health import router as health_router
+from app.routes.metrics import router as metrics_router
 from app.routes.me import router as me_router
 from app.routes.cities import router as cities_router
 from app.routes.events import router as events_router
 from app.routes.decks import router as decks_router
 from app.routes.notifications import router as notifications_router  # ✅ ADD
 from app.routes import profiles
+from app.supabase_client import get_supabase_admin
+from app.supabase_user_client import init_user_client_pool, close_user_client_pool
 
 logger = logging.getLogger("untapgo")
 
-app = FastAPI(title="Tap In API")
+
+async def _warm_admin() -> None:
+  # Heavy imports (supabase, numpy) run in the threadpool after the app is up,
+  # then the caches that need the service-role client fill in
+  try:
+    await run_in_threadpool(get_supabase_admin)
+  except Exception:
+    logger.exception("admin client warm-up failed")
+    return
+  formats.warm()
+  cities.warm()
+  await run_in_threadpool(geo.preload)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+  started = time.perf_counter()
+  # Shared PostgREST connection pool: opened once, reused by every request
+  init_user_client_pool()
+  # Signing keys load in the background; first requests share that fetch
+  warm_jwks()
+  # slug -> format id map and city catalog, resolved locally from here on
+  warm_task = asyncio.ensure_future(_warm_admin())
+  # Notification side effects run from a local persistent queue
+  if JOBS_ENABLED:
+    jobs.queue.start()
+  logger.info(
+    "startup: imports %.0f ms, lifespan %.0f ms",
+    _import_ms,
+    (time.perf_counter() - started) * 1000.0,
+  )
+  try:
+    yield
+  finally:
+    warm_task.cancel()
+    await jobs.queue.stop()
+    await close_user_client_pool()
+
+
+app = FastAPI(title="Tap In API", lifespan=lifespan)
+
+# Conditional GETs: ETag on JSON reads, 304 when the client copy is current
+app.add_middleware(ETagMiddleware)
+
+# Outermost: per-route latency / status / upstream call counts for /metrics,
+# Server-Timing and the slow request log
+app.add_middleware(
+  MetricsMiddleware,
+  server_timing=SERVER_TIMING,
+  debug_token=ADMIN_TOKEN,
+  slow_ms=SLOW_REQUEST_MS,
+)
 
 # ─────────────────────────────────────────────────────────────
 # Global error handler (prevents "silent" 500s)
@@ -38,3 +109,8 @@ app.include_router(events_router)
 app.include_router(decks_router)
 app.include_router(notifications_router)  # ✅ ADD
 app.include_router(profiles.router)
+app.include_router(admin_router)
+app.include_router(batch_router)
+app.include_router(metrics_router)
+
+_import_ms = (time.perf_counter() - _import_started) * 1000.0
@@ -0,0 +1,335 @@
+"""
+In-process metrics, rendered in Prometheus text format at GET /metrics.
+
+Everything is recorded on the event loop thread (threadpool timings are
+measured inside the worker but observed back on the loop), so the hot path
+is a few dict lookups and integer adds with no locks. Each metric keeps at
+most MAX_SERIES label sets; extra ones are folded into "other".
+"""
+import bisect
+import contextvars
+import hmac
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Sequence, Tuple
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MAX_SERIES = 500
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(v: str) -> str:
+    return v.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _fmt_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _fmt_num(v: float) -> str:
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if not float(v).is_integer() else str(int(v))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help_
+        self.labels = tuple(labels)
+
+    def _key(self, values: Labels, series: Dict) -> Labels:
+        if values in series or len(series) < MAX_SERIES:
+            return values
+        return tuple("other" for _ in self.labels)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = ()):
+        super().__init__(name, help_, labels)
+        self._values: Dict[Labels, float] = {}
+
+    def inc(self, *values: str, by: float = 1.0) -> None:
+        key = self._key(values, self._values)
+        self._values[key] = self._values.get(key, 0.0) + by
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for values, v in list(self._values.items()):
+            out.append(f"{self.name}{_fmt_labels(self.labels, values)} {_fmt_num(v)}")
+        return out
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help_: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, help_, labels)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self._series: Dict[Labels, List[float]] = {}
+
+    def observe(self, value: float, *values: str) -> None:
+        key = self._key(values, self._series)
+        s = self._series.get(key)
+        if s is None:
+            s = self._series[key] = [0] * (len(self.buckets) + 1) + [0.0]
+        s[bisect.bisect_left(self.buckets, value)] += 1
+        s[-1] += value
+
+    def totals(self) -> Dict[Labels, Tuple[int, float]]:
+        """label values -> (observations, sum)"""
+        return {values: (int(sum(s[:-1])), s[-1]) for values, s in list(self._series.items())}
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for values, s in list(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets + (float("inf"),), s[:-1]):
+                cumulative += n
+                le = 'le="' + _fmt_num(bound) + '"'
+                out.append(f"{self.name}_bucket{_fmt_labels(self.labels, values, le)} {cumulative}")
+            out.append(f"{self.name}_sum{_fmt_labels(self.labels, values)} {_fmt_num(s[-1])}")
+            out.append(f"{self.name}_count{_fmt_labels(self.labels, values)} {cumulative}")
+        return out
+
+
+class Collected(_Metric):
+    """Read at scrape time from a callback returning {label values: value}."""
+
+    def __init__(
+        self,
+        name: str,
+        help_: str,
+        fn: Callable[[], Dict[Labels, Optional[float]]],
+        labels: Sequence[str] = (),
+        kind: str = "gauge",
+    ):
+        super().__init__(name, help_, labels)
+        self.kind = kind
+        self._fn = fn
+
+    def render(self) -> List[str]:
+        out = self.header()
+        for values, v in self._fn().items():
+            if v is None:
+                continue
+            out.append(f"{self.name}{_fmt_labels(self.labels, values)} {_fmt_num(v)}")
+        return out
+
+
+# ---------------- metric definitions ----------------
+
+http_requests = Counter(
+    "untapgo_http_requests_total", "HTTP requests by route template, method and status.",
+    ("route", "method", "status"),
+)
+http_duration = Histogram(
+    "untapgo_http_request_duration_seconds", "Time from request start to last response byte.",
+    ("route", "method"),
+)
+http_upstream_calls = Histogram(
+    "untapgo_http_upstream_calls_per_request", "PostgREST/RPC calls made while serving one request.",
+    ("route", "method"), buckets=COUNT_BUCKETS,
+)
+upstream_duration = Histogram(
+    "untapgo_upstream_call_duration_seconds", "PostgREST call time, by RPC name or table + method.",
+    ("call", "outcome"),
+)
+threadpool_wait = Histogram(
+    "untapgo_threadpool_wait_seconds", "Time a sync PostgREST call waited for a threadpool worker.",
+)
+jwt_verify = Histogram(
+    "untapgo_jwt_verify_seconds", "Bearer token verification time (claims cache hit or full verify).",
+    ("result",),
+)
+
+# Last N requests slower than the middleware's slow_ms, newest last
+SLOW_REQUESTS_KEPT = 200
+slow_requests: Deque[Dict[str, Any]] = deque(maxlen=SLOW_REQUESTS_KEPT)
+
+_registry: List[_Metric] = [
+    http_requests, http_duration, http_upstream_calls, upstream_duration, threadpool_wait, jwt_verify,
+]
+
+
+def register(metric: _Metric) -> None:
+    _registry.append(metric)
+
+
+def render() -> str:
+    lines: List[str] = []
+    for m in _registry:
+        lines.extend(m.render())
+    return "\n".join(lines) + "\n"
+
+
+# ---------------- per-request trace ----------------
+
+# Spans kept per request (Server-Timing / slow request log)
+MAX_SPANS = 40
+
+
+class RequestTrace:
+    __slots__ = ("upstream_calls", "spans")
+
+    def __init__(self) -> None:
+        self.upstream_calls = 0
+        self.spans: List[Tuple[str, float]] = []
+
+    def add(self, name: str, seconds: float) -> None:
+        if len(self.spans) < MAX_SPANS:
+            self.spans.append((name, seconds))
+
+
+# Set by MetricsMiddleware; tasks spawned by the request (gather) share it
+_trace: "contextvars.ContextVar[Optional[RequestTrace]]" = contextvars.ContextVar(
+    "untapgo_request_trace", default=None
+)
+
+
+def span(name: str, seconds: float) -> None:
+    """Attach a timed step (auth, client, serialize...) to the current request."""
+    trace = _trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+
+
+def call_name(query) -> str:
+    """'rpc:get_events_feed' or 'GET notifications' for a PostgREST builder."""
+    req = getattr(query, "request", None)
+    path = str(getattr(req, "path", "") or "")
+    method = str(getattr(req, "http_method", "") or "")
+    if "/rest/v1/" in path:
+        path = path.split("/rest/v1/", 1)[1]
+    path = path.split("?", 1)[0].strip("/")
+    if not path:
+        return "unknown"
+    if path.startswith("rpc/"):
+        return "rpc:" + path[4:]
+    return f"{method} {path}".strip()
+
+
+def observe_upstream(name: str, seconds: float, ok: bool) -> None:
+    upstream_duration.observe(seconds, name, "ok" if ok else "error")
+    trace = _trace.get()
+    if trace is not None:
+        trace.upstream_calls += 1
+        trace.add(name, seconds)
+
+
+def now() -> float:
+    return time.perf_counter()
+
+
+# ---------------- middleware ----------------
+
+def _server_timing(trace: RequestTrace, total: float) -> bytes:
+    parts = []
+    for i, (name, seconds) in enumerate(trace.spans):
+        token = "".join(c if c.isalnum() or c in "_-" else "_" for c in name)
+        parts.append(f'{i:02d}_{token};dur={seconds * 1000.0:.1f};desc="{_escape(name)}"')
+    parts.append(f"total;dur={total * 1000.0:.1f}")
+    return ", ".join(parts).encode("latin-1", errors="replace")
+
+
+class MetricsMiddleware:
+    """
+    Per-route request count, duration and upstream calls per request.
+
+    Also collects a per-request trace (auth, client setup, every upstream
+    call, serialization). It is sent back as a Server-Timing header when
+    `server_timing` is on, or when the request carries
+    `X-Server-Timing: <debug_token>`. Requests slower than `slow_ms` are
+    kept, trace included, in `slow_requests` (GET /admin/slow_requests);
+    event streams are left out of both the slow log and the durations.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        server_timing: bool = False,
+        debug_token: Optional[str] = None,
+        slow_ms: float = 1000.0,
+    ):
+        self.app = app
+        self.server_timing = server_timing
+        self.debug_token = debug_token
+        self.slow_ms = slow_ms
+
+    def _wants_timing(self, scope: Scope) -> bool:
+        if self.server_timing:
+            return True
+        if not self.debug_token:
+            return False
+        for k, v in scope.get("headers", []):
+            if k == b"x-server-timing":
+                return hmac.compare_digest(v, self.debug_token.encode("latin-1"))
+        return False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace()
+        token = _trace.set(trace)
+        start = now()
+        status = 500
+        streaming = False
+        timing = self._wants_timing(scope)
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status, streaming
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                for k, v in message.get("headers", []):
+                    if k.lower() == b"content-type" and v.startswith(b"text/event-stream"):
+                        streaming = True
+                if timing:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(trace, now() - start)))
+                    message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _trace.reset(token)
+            elapsed = now() - start
+            # The router stores the matched route on the scope: label by template
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            method = scope.get("method", "")
+            http_requests.inc(route, method, str(status))
+            if not streaming:
+                # A stream's lifetime is not a request duration
+                http_duration.observe(elapsed, route, method)
+            http_upstream_calls.observe(trace.upstream_calls, route, method)
+
+            # Streams (SSE) stay open by design; they are not slow requests
+            if not streaming and elapsed * 1000.0 >= self.slow_ms:
+                slow_requests.append({
+                    "at": time.time(),
+                    "method": method,
+                    "route": route,
+                    "path": scope.get("path"),
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000.0, 1),
+                    "upstream_calls": trace.upstream_calls,
+                    "spans": [{"name": n, "ms": round(sec * 1000.0, 1)} for n, sec in trace.spans],
+                })
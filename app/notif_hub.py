@@ -0,0 +1,144 @@
+import asyncio
+import uuid
+from collections import OrderedDict, deque
+from typing import Any, Deque, Dict, Iterable, List, Optional, Set, Tuple
+
+from app.config import SSE_MAX_CONNECTIONS, SSE_MAX_PER_USER
+
+# Per-connection backlog; a client that falls this far behind is dropped and
+# catches up through Last-Event-ID on reconnect
+SUBSCRIBER_QUEUE_SIZE = 32
+
+# Resume buffer: last N events per user, for at most REPLAY_USERS users (LRU)
+REPLAY_PER_USER = 50
+REPLAY_USERS = 10000
+
+
+class HubFull(Exception):
+    pass
+
+
+class Subscription:
+    __slots__ = ("user_id", "queue", "overflowed")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id
+        self.queue: "asyncio.Queue[Tuple[str, Dict[str, Any]]]" = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        self.overflowed = False
+
+
+class NotificationHub:
+    """
+    In-process pub/sub for new notification rows, keyed by recipient.
+
+    Event ids are "<epoch>-<seq>": seq is per process, epoch changes on every
+    restart. A Last-Event-ID from this epoch still in the replay buffer is
+    resumed exactly; anything else gets a "reset" event so the client
+    refetches GET /notifications once.
+    """
+
+    def __init__(self, max_connections: int, max_per_user: int):
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.epoch = uuid.uuid4().hex[:12]
+
+        self._seq = 0
+        self._subs: Dict[str, Set[Subscription]] = {}
+        self._n_subs = 0
+        self._recent: "OrderedDict[str, Deque[Tuple[int, Dict[str, Any]]]]" = OrderedDict()
+        # Highest seq evicted from each user's buffer, and from evicted users
+        self._floors: Dict[str, int] = {}
+        self._lru_floor = 0
+        self._published = 0
+        self._dropped = 0
+
+    # ---------------- subscribers ----------------
+
+    def check_capacity(self, user_id: str) -> None:
+        if self._n_subs >= self.max_connections:
+            raise HubFull("too many streams")
+        if len(self._subs.get(user_id, ())) >= self.max_per_user:
+            raise HubFull("too many streams for this user")
+
+    def subscribe(self, user_id: str) -> Subscription:
+        self.check_capacity(user_id)
+        sub = Subscription(user_id)
+        self._subs.setdefault(user_id, set()).add(sub)
+        self._n_subs += 1
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.user_id)
+        if subs is None or sub not in subs:
+            return
+        subs.discard(sub)
+        self._n_subs -= 1
+        if not subs:
+            del self._subs[sub.user_id]
+
+    def replay(self, user_id: str, last_event_id: Optional[str]) -> Optional[List[Tuple[str, Dict[str, Any]]]]:
+        """Events after `last_event_id`, or None if they can't be reconstructed."""
+        if not last_event_id:
+            return []
+        epoch, _, seq_s = last_event_id.partition("-")
+        if epoch != self.epoch or not seq_s.isdigit():
+            return None
+        seq = int(seq_s)
+
+        if seq > self._seq:
+            return None
+        floor = self._floors.get(user_id, 0) if user_id in self._recent else self._lru_floor
+        if seq >= floor:
+            return [(self._event_id(s), row) for s, row in self._recent.get(user_id, ()) if s > seq]
+        return None  # some of this user's events after `seq` fell out of the buffer
+
+    # ---------------- publisher ----------------
+
+    def publish(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            uid = str(row.get("user_id"))
+            self._seq += 1
+            self._published += 1
+            self._remember(uid, self._seq, row)
+
+            ev = (self._event_id(self._seq), row)
+            for sub in self._subs.get(uid, ()):
+                try:
+                    sub.queue.put_nowait(ev)
+                except asyncio.QueueFull:
+                    sub.overflowed = True
+                    self._dropped += 1
+
+    def _remember(self, uid: str, seq: int, row: Dict[str, Any]) -> None:
+        recent = self._recent.get(uid)
+        if recent is None:
+            recent = self._recent[uid] = deque(maxlen=REPLAY_PER_USER)
+            if self._lru_floor:
+                # This user's older events may have gone with an evicted buffer
+                self._floors[uid] = self._lru_floor
+            if len(self._recent) > REPLAY_USERS:
+                old_uid, old = self._recent.popitem(last=False)
+                self._floors.pop(old_uid, None)
+                self._lru_floor = max(self._lru_floor, old[-1][0])
+        else:
+            self._recent.move_to_end(uid)
+            if len(recent) == recent.maxlen:
+                self._floors[uid] = recent[0][0]
+        recent.append((seq, row))
+
+    def last_event_id(self) -> str:
+        return self._event_id(self._seq)
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.epoch}-{seq}"
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "connections": self._n_subs,
+            "users": len(self._subs),
+            "published_total": self._published,
+            "dropped_total": self._dropped,
+        }
+
+
+hub = NotificationHub(SSE_MAX_CONNECTIONS, SSE_MAX_PER_USER)
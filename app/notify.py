@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+from uuid import UUID
+
+from postgrest.types import ReturnMethod
+
+from app.notif_hub import hub
+from app.supabase_client import supabase_admin
+from app.supabase_user_client import execute
+from app.unread import add_unread
+
+logger = logging.getLogger("untapgo")
+
+# Rows per bulk INSERT (one PostgREST round trip each)
+NOTIF_INSERT_CHUNK = 200
+
+
+def notif_row(
+    user_id: Any,
+    event_id: Optional[Any],
+    type_: str,
+    title: str,
+    body: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    return {
+        "user_id": str(user_id),
+        "event_id": str(event_id) if event_id else None,
+        "type": type_,
+        "title": title,
+        "body": body,
+        "meta": meta or {},
+        "is_read": False,
+    }
+
+
+async def insert_notifications(rows: List[Dict[str, Any]]) -> None:
+    """Single bulk insert; raises on failure. Uses the service role (bypass RLS)."""
+    if not rows:
+        return
+    r = await execute(
+        supabase_admin.table("notifications").insert(rows, returning=ReturnMethod.representation)
+    )
+    # Stored rows carry id / created_at, which stream clients need to mark
+    # read and to order pushes against GET /notifications
+    stored = r.data or []
+    add_unread(n["user_id"] for n in stored if not n.get("is_read"))
+    # Live push to open /notifications/stream connections
+    hub.publish(stored)
+
+
+async def fan_out(
+    rows: List[Dict[str, Any]],
+    chunk_size: int = NOTIF_INSERT_CHUNK,
+) -> Dict[str, Any]:
+    """
+    Write many notification rows as concurrent chunked bulk inserts.
+    A failed chunk doesn't stop the others; its recipients are reported.
+    """
+    chunks = [rows[i:i + chunk_size] for i in range(0, len(rows), chunk_size)]
+    results = await asyncio.gather(
+        *(insert_notifications(c) for c in chunks),
+        return_exceptions=True,
+    )
+
+    inserted = 0
+    failed_user_ids: List[str] = []
+    for chunk, res in zip(chunks, results):
+        if isinstance(res, BaseException):
+            logger.warning("Notification chunk of %d failed: %s", len(chunk), res)
+            failed_user_ids.extend(r["user_id"] for r in chunk)
+        else:
+            inserted += len(chunk)
+
+    return {
+        "requested": len(rows),
+        "inserted": inserted,
+        "failed_user_ids": failed_user_ids,
+    }
+
+
+async def broadcast(
+    user_ids: Iterable[Any],
+    event_id: Optional[UUID],
+    type_: str,
+    title: str,
+    body: str,
+    meta: Optional[Dict[str, Any]] = None,
+) -> Dict[str, Any]:
+    """
+    Same notification to many users (event cancelled, edited, reminders...).
+    `failed_user_ids` only lists recipients worth retrying; malformed ids are
+    logged and reported under `invalid_user_ids`.
+    """
+    seen = set()
+    rows = []
+    invalid: List[str] = []
+    for uid in user_ids:
+        if not uid or str(uid) in seen:
+            continue
+        seen.add(str(uid))
+        try:
+            UUID(str(uid))
+        except ValueError:
+            # A bad id would fail its whole chunk, and never succeeds on retry
+            invalid.append(str(uid))
+            continue
+        rows.append(notif_row(uid, event_id, type_, title, body, meta))
+
+    if invalid:
+        logger.warning("Dropping %d invalid notification recipient(s): %s", len(invalid), invalid[:10])
+
+    report = await fan_out(rows)
+    report["requested"] += len(invalid)
+    report["invalid_user_ids"] = invalid
+    return report
@@ -0,0 +1,44 @@
+import base64
+import heapq
+import json
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+
+def encode_cursor(kind: str, values: Dict[str, Any]) -> str:
+    raw = json.dumps({"k": kind, **values}, separators=(",", ":"), default=str)
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], kind: str) -> Optional[Dict[str, Any]]:
+    """
+    Opaque cursor -> dict, or None when no cursor was sent.
+    A cursor from another listing (or garbage) is a client error.
+    """
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        d = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception:
+        raise HTTPException(status_code=400, detail={"code": "CURSOR_INVALID"})
+    if not isinstance(d, dict) or d.get("k") != kind:
+        raise HTTPException(status_code=400, detail={"code": "CURSOR_INVALID"})
+    return d
+
+
+def keyset_page(
+    items: Iterable[Any],
+    sort_key: Callable[[Any], Tuple],
+    after: Optional[Tuple],
+    limit: int,
+) -> Tuple[List[Any], bool]:
+    """
+    Items strictly after `after` in sort_key order, at most `limit`.
+    Returns (page, has_more). Only the first limit+1 are ordered.
+    """
+    if after is not None:
+        items = (it for it in items if sort_key(it) > after)
+    head = heapq.nsmallest(limit + 1, items, key=sort_key)
+    return head[:limit], len(head) > limit
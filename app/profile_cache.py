@@ -0,0 +1,43 @@
+import copy
+import time
+from typing import Any, Dict, Optional, Tuple
+
+from cachetools import TTLCache
+
+from app.config import PROFILE_CACHE_SIZE, PROFILE_CACHE_TTL_S
+
+# (viewer id, user id) -> assembled public profile (profile row + hosted/played
+# counts) as that viewer's RLS-scoped fetch returned it. Keyed by viewer so one
+# viewer's visibility never serves another. Stats drift for at most the TTL;
+# the owner's own edits invalidate right away.
+_profiles: TTLCache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL_S)
+
+# user id -> when it was last invalidated. Entries fetched before that (for
+# any viewer) are stale, and a fetch that started before a PATCH /me/profile
+# can't put the old profile back.
+_invalidated_at: TTLCache = TTLCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL_S)
+
+
+def _key(viewer_id: Any, user_id: Any) -> Tuple[str, str]:
+    return (str(viewer_id), str(user_id))
+
+
+def get_cached_profile(viewer_id: Any, user_id: Any) -> Optional[Dict[str, Any]]:
+    hit = _profiles.get(_key(viewer_id, user_id))
+    if hit is None:
+        return None
+    fetched_since, profile = hit
+    if _invalidated_at.get(str(user_id), float("-inf")) >= fetched_since:
+        return None
+    return copy.deepcopy(profile)
+
+
+def put_cached_profile(viewer_id: Any, user_id: Any, profile: Dict[str, Any], fetched_since: float) -> None:
+    """`fetched_since`: time.monotonic() taken before the upstream fetch started."""
+    if _invalidated_at.get(str(user_id), float("-inf")) >= fetched_since:
+        return
+    _profiles[_key(viewer_id, user_id)] = (fetched_since, copy.deepcopy(profile))
+
+
+def invalidate_profile(user_id: str) -> None:
+    _invalidated_at[str(user_id)] = time.monotonic()
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Query
+
+from app import jobs, metrics
+from app.auth import claims_cache_stats, require_admin
+from app.city_catalog import cities
+from app.coalesce import coalesce_stats
+from app.formats import formats
+from app.notif_hub import hub
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.post("/formats/refresh")
+async def refresh_formats():
+    n = await formats.refresh()
+    return {"ok": True, "formats": n}
+
+
+@router.post("/cities/refresh")
+async def refresh_cities():
+    cities.invalidate()
+    snap = await cities.snapshot()
+    return {"ok": True, "cities": len(snap.rows), "etag": snap.etag}
+
+
+@router.get("/slow_requests")
+async def slow_requests(limit: int = Query(50, ge=1, le=metrics.SLOW_REQUESTS_KEPT)):
+    """Most recent slow requests first, each with its span breakdown."""
+    items = list(metrics.slow_requests)[-limit:]
+    items.reverse()
+    return {"items": items}
+
+
+@router.get("/stats")
+async def stats():
+    """Queue, stream, cache and coalescing internals (was public on /health)."""
+    return {
+        "auth_claims_cache": claims_cache_stats(),
+        "jobs": jobs.queue.stats(),
+        "notification_streams": hub.stats(),
+        "read_coalescing": coalesce_stats(),
+    }
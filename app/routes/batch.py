@@ -0,0 +1,143 @@
+import asyncio
+import json
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import quote, unquote, urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import BaseModel, Field
+
+from app.auth import PREAUTH_SCOPE_KEY, get_current_user
+from app.constants.limits import BATCH_MAX_ITEMS
+
+logger = logging.getLogger("untapgo")
+
+router = APIRouter(tags=["batch"])
+
+# Streams and the batch itself can't be answered as one JSON item
+_EXCLUDED_PREFIXES = ("/batch", "/notifications/stream", "/admin")
+
+# Request headers a sub-request may carry (auth comes from the batch)
+_FORWARDED_HEADERS = ("if-none-match", "accept-language")
+
+
+class BatchItemIn(BaseModel):
+    id: Optional[str] = None
+    method: str = "GET"
+    path: str = Field(min_length=1, max_length=2048)
+    headers: Optional[Dict[str, str]] = None
+
+
+class BatchIn(BaseModel):
+    requests: List[BatchItemIn] = Field(min_length=1, max_length=BATCH_MAX_ITEMS)
+
+
+# Characters left as-is when re-encoding a sub-request URL (existing %XX escapes included)
+_URL_SAFE = "/%:@!$&'()*+,;=-._~?"
+
+
+def _check_item(item: BatchItemIn) -> Tuple[str, bytes, bytes]:
+    """(decoded path, raw path, query string) for the ASGI scope."""
+    if item.method.upper() != "GET":
+        raise HTTPException(
+            status_code=422,
+            detail={"code": "BATCH_READ_ONLY", "id": item.id, "path": item.path},
+        )
+    parts = urlsplit(item.path)
+    # Routing (and the exclusions below) see the decoded path, like a real request
+    path = unquote(parts.path)
+    if parts.scheme or parts.netloc or not path.startswith("/") or path.startswith(_EXCLUDED_PREFIXES):
+        raise HTTPException(
+            status_code=422,
+            detail={"code": "BATCH_PATH_NOT_ALLOWED", "id": item.id, "path": item.path},
+        )
+    raw_path = quote(parts.path, safe=_URL_SAFE).encode("ascii")
+    return path, raw_path, quote(parts.query, safe=_URL_SAFE).encode("ascii")
+
+
+async def _dispatch(
+    request: Request,
+    user: Dict[str, Any],
+    item: BatchItemIn,
+    path: str,
+    raw_path: bytes,
+    query: bytes,
+) -> Dict[str, Any]:
+    """Run one GET through the full app (middleware included) in-process."""
+    headers: List[Tuple[bytes, bytes]] = [(b"accept", b"application/json")]
+    auth = request.headers.get("authorization")
+    if auth:
+        headers.append((b"authorization", auth.encode("latin-1")))
+    for k, v in (item.headers or {}).items():
+        if k.lower() in _FORWARDED_HEADERS:
+            headers.append((k.lower().encode("latin-1"), v.encode("latin-1")))
+
+    parent = request.scope
+    scope = {
+        "type": "http",
+        "asgi": parent.get("asgi", {"version": "3.0"}),
+        "http_version": parent.get("http_version", "1.1"),
+        "method": "GET",
+        "scheme": parent.get("scheme", "http"),
+        "server": parent.get("server"),
+        "client": parent.get("client"),
+        "root_path": parent.get("root_path", ""),
+        "path": path,
+        "raw_path": raw_path,
+        "query_string": query,
+        "headers": headers,
+        "state": dict(parent.get("state") or {}),
+        PREAUTH_SCOPE_KEY: user,
+    }
+
+    async def receive() -> Dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    status = 500
+    resp_headers: Dict[str, str] = {}
+    chunks: List[bytes] = []
+
+    async def send(message: Dict[str, Any]) -> None:
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            for k, v in message.get("headers", []):
+                resp_headers[k.decode("latin-1").lower()] = v.decode("latin-1")
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The app's error handler already answered 500; keep the other items
+        logger.exception("Batch item failed: GET %s", path)
+
+    raw = b"".join(chunks)
+    body: Any = None
+    if raw:
+        try:
+            is_json = resp_headers.get("content-type", "").startswith("application/json")
+            body = json.loads(raw) if is_json else raw.decode("utf-8", errors="replace")
+        except ValueError:
+            body = raw.decode("utf-8", errors="replace")
+
+    out_headers = {k: resp_headers[k] for k in ("etag", "cache-control") if k in resp_headers}
+    return {"id": item.id, "status": status, "headers": out_headers, "body": body}
+
+
+@router.post("/batch")
+async def batch(payload: BatchIn, request: Request, user=Depends(get_current_user)):
+    """
+    Several read-only GETs in one round trip. The caller is authenticated
+    once here; sub-requests run concurrently through the normal routes and
+    each reports its own status, ETag and body.
+    """
+    checked = [_check_item(item) for item in payload.requests]
+
+    results = await asyncio.gather(
+        *(
+            _dispatch(request, user, item, path, raw_path, query)
+            for item, (path, raw_path, query) in zip(payload.requests, checked)
+        )
+    )
+    return {"responses": list(results)}
@@ -1,17 +1,49 @@
-from fastapi import APIRouter
-from app.supabase_client import supabase_admin
+from typing import Optional
+
+from fastapi import APIRouter, Request, Response
+
+from app.city_catalog import cities
+from app.config import CITIES_MAX_AGE_S
+from app.etag import etag_matches
 
 router = APIRouter(prefix="/cities", tags=["cities"])
 
+# Public list, same for everyone: shared caches may keep it too
+_CACHE_CONTROL = f"public, max-age={CITIES_MAX_AGE_S}, stale-while-revalidate=86400"
+
+
+def _accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """gzip (or *) listed with q > 0; an explicit gzip entry wins over *."""
+    if not accept_encoding:
+        return False
+    q_by_coding = {}
+    for part in accept_encoding.split(","):
+        coding, _, params = part.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        q_by_coding[coding.strip().lower()] = q
+    q = q_by_coding.get("gzip", q_by_coding.get("*", 0.0))
+    return q > 0
+
+
 @router.get("")
-def list_cities():
-    res = (
-        supabase_admin
-        .table("cities")
-        .select("id,name,center_lat,center_lng,radius_m")
-        .eq("is_active", True)
-        .order("name")
-        .execute()
-    )
-    return {"cities": res.data or []}
+async def list_cities(request: Request):
+    snap = await cities.snapshot()
+    gz = _accepts_gzip(request.headers.get("accept-encoding"))
+    etag = snap.etag_gzip if gz else snap.etag
+    headers = {"ETag": etag, "Cache-Control": _CACHE_CONTROL, "Vary": "Accept-Encoding"}
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+
+    if gz:
+        headers["Content-Encoding"] = "gzip"
+        return Response(content=snap.body_gzip, media_type="application/json", headers=headers)
 
+    return Response(content=snap.body, media_type="application/json", headers=headers)
@@ -1,3 +1,4 @@
+import logging
 from typing import Optional, Any, Dict
 
 from fastapi import APIRouter, Depends, HTTPException, Query
@@ -5,10 +6,13 @@ from pydantic import BaseModel, Field, HttpUrl
 from postgrest.exceptions import APIError
 
 from app.auth import get_current_user
-from app.supabase_user_client import get_supabase_for_user
+from app.formats import formats, normalize_slug
+from app.supabase_user_client import execute, get_supabase_for_user
 from app.http_errors import raise_http_for_api_error
 
 
+logger = logging.getLogger("untapgo")
+
 router = APIRouter(prefix="/me/decks", tags=["decks"])
 
 
@@ -63,10 +67,22 @@ def _normalize_export_text(v: Optional[str]) -> Optional[str]:
 
 
 def _normalize_format_slug(v: Optional[str]) -> Optional[str]:
-    if v is None:
+    return normalize_slug(v)
+
+
+async def _validated_format_slug(v: Optional[str]) -> Optional[str]:
+    s = _normalize_format_slug(v)
+    if s is None:
         return None
-    s = str(v).strip().lower()
-    return s if s else None
+    try:
+        valid = await formats.is_valid(s)
+    except Exception:
+        # Registry down: accept the slug as before validation existed
+        logger.exception("Format registry unavailable, skipping deck format check")
+        return s
+    if not valid:
+        raise HTTPException(status_code=422, detail={"code": "FORMAT_SLUG_INVALID", "slug": s})
+    return s
 
 
 # -------------------------------------------------
@@ -74,7 +90,7 @@ def _normalize_format_slug(v: Optional[str]) -> Optional[str]:
 # -------------------------------------------------
 
 @router.post("")
-def add_deck(
+async def add_deck(
     payload: DeckCreate,
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
@@ -96,10 +112,10 @@ def add_deck(
         )
 
     data["export_text"] = _normalize_export_text(data.get("export_text"))
-    data["format_slug"] = _normalize_format_slug(data.get("format_slug"))
+    data["format_slug"] = await _validated_format_slug(data.get("format_slug"))
 
     try:
-        res = supabase.table("decks").insert(data).execute()
+        res = await execute(supabase.table("decks").insert(data))
     except APIError as e:
         raise_http_for_api_error(e)
 
@@ -110,7 +126,7 @@ def add_deck(
 
 
 @router.get("")
-def list_my_decks(
+async def list_my_decks(
     current_user: Dict[str, Any] = Depends(get_current_user),
     format_slug: Optional[str] = Query(default=None),
 ):
@@ -134,7 +150,7 @@ def list_my_decks(
         if fmt:
             q = q.eq("format_slug", fmt)
 
-        res = q.order("created_at", desc=True).execute()
+        res = await execute(q.order("created_at", desc=True))
 
     except APIError as e:
         raise_http_for_api_error(e)
@@ -143,7 +159,7 @@ def list_my_decks(
 
 
 @router.patch("/{deck_id}")
-def update_deck(
+async def update_deck(
     deck_id: str,
     payload: DeckUpdate,
     current_user: Dict[str, Any] = Depends(get_current_user),
@@ -166,15 +182,14 @@ def update_deck(
         patch["export_text"] = _normalize_export_text(patch.get("export_text"))
 
     if "format_slug" in patch:
-        patch["format_slug"] = _normalize_format_slug(patch.get("format_slug"))
+        patch["format_slug"] = await _validated_format_slug(patch.get("format_slug"))
 
     try:
-        upd = (
+        upd = await execute(
             supabase.table("decks")
             .update(patch)
             .eq("id", deck_id)
             .eq("user_id", current_user["id"])
-            .execute()
         )
     except APIError as e:
         raise_http_for_api_error(e)
@@ -182,20 +197,19 @@ def update_deck(
     if not getattr(upd, "data", None):
         raise HTTPException(status_code=404, detail={"code": "DECK_NOT_FOUND"})
 
-    res = (
+    res = await execute(
         supabase.table("decks")
         .select("*")
         .eq("id", deck_id)
         .eq("user_id", current_user["id"])
         .single()
-        .execute()
     )
 
     return res.data
 
 
 @router.delete("/{deck_id}")
-def delete_deck(
+async def delete_deck(
     deck_id: str,
     current_user: Dict[str, Any] = Depends(get_current_user),
 ):
@@ -203,12 +217,11 @@ def delete_deck(
     supabase = get_supabase_for_user(token)
 
     try:
-        res = (
+        res = await execute(
             supabase.table("decks")
             .delete()
             .eq("id", deck_id)
             .eq("user_id", current_user["id"])
-            .execute()
         )
     except APIError as e:
         raise_http_for_api_error(e)
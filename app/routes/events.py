@@ -1,23 +1,41 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-import math
+import logging
 from datetime import datetime, timedelta, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException, Query
 from pydantic import BaseModel, ConfigDict
 from postgrest.exceptions import APIError
 
+from app import jobs
 from app.auth import get_current_user
-from app.constants.limits import HOST_NOTES_MAX
+from app.coalesce import read_rpc
+from app.config import (
+    FEED_CATALOG_CACHE,
+    FEED_CATALOG_TTL_S,
+    FEED_KEYSET_PUSHDOWN,
+    FEED_RADIUS_PUSHDOWN,
+)
+from app.constants.limits import FEED_PAGE_DEFAULT, FEED_PAGE_MAX, HOST_NOTES_MAX
+from app.event_catalog import EventCatalog
+from app.fastjson import trusted
+from app.formats import formats, normalize_slug
+from app.geo import GridIndex, batch_haversine_km
 from app.http_errors import raise_http_for_api_error
+from app.notify import broadcast, insert_notifications, notif_row
+from app.pagination import decode_cursor, encode_cursor, keyset_page
 from app.supabase_client import supabase_admin
-from app.supabase_user_client import get_supabase_for_user
+from app.supabase_user_client import execute, get_supabase_for_user
 
 router = APIRouter(prefix="/events", tags=["events"])
 
+logger = logging.getLogger("untapgo")
+
 
 # ----------------------------
 # Models
@@ -58,6 +76,33 @@ class EventOut(BaseModel):
     cooldown_seconds: Optional[int] = None
 
 
+class EventPage(BaseModel):
+    items: List[EventOut]
+    next_cursor: Optional[str] = None
+
+
+class EventRemoved(BaseModel):
+    id: UUID
+    status: str
+
+
+class EventChangesOut(BaseModel):
+    # reset=True: upserts is the whole feed, drop any local copy first
+    reset: bool
+    upserts: List[EventOut]
+    removed: List[EventRemoved]
+    # Caller's memberships, only sent when they changed since `since`
+    memberships: Optional[List[Dict[str, Any]]] = None
+    next_since: str
+
+
+class EventFullOut(BaseModel):
+    event: EventOut
+    attendees: List[Dict[str, Any]]
+    # Only for the host; null for everyone else
+    requests: Optional[List[Dict[str, Any]]] = None
+
+
 class KickIn(BaseModel):
     user_id: UUID
     cooldown_minutes: int = 10
@@ -246,39 +291,208 @@ def _get_supa(user: Dict[str, Any]):
     raise HTTPException(status_code=401, detail={"code": "AUTH_REQUIRED"})
 
 
-def _format_id_from_slug(supa, slug: str) -> int:
-    s = (slug or "").strip().lower()
+async def _format_id_from_slug(slug: str) -> int:
+    s = normalize_slug(slug)
     if not s:
         raise HTTPException(status_code=422, detail={"code": "FORMAT_SLUG_REQUIRED"})
 
-    r = supa.table("formats").select("id").eq("slug", s).limit(1).execute()
-    if not r.data:
+    try:
+        fid = await formats.id_for(s)
+    except Exception:
+        logger.exception("Format registry unavailable")
+        raise HTTPException(status_code=503, detail={"code": "FORMATS_UNAVAILABLE"})
+    if fid is None:
         raise HTTPException(status_code=422, detail={"code": "FORMAT_SLUG_INVALID", "slug": s})
 
-    return int(r.data[0]["id"])
+    return fid
 
 
 # ----------------------------
-# Nearby helpers
+# Shared feed catalog (FEED_CATALOG_CACHE=1)
 # ----------------------------
+# get_events_feed rows are the same for everyone except is_joined / my_status /
+# cooldown_seconds. The catalog is loaded once with the service role and each
+# user's memberships are merged in per request.
+
+async def _load_feed_catalog() -> List[Dict[str, Any]]:
+    r = await execute(supabase_admin.rpc("get_events_feed", {"include_full": True}))
+    return r.data or []
 
-def _haversine_km(lat1: float, lng1: float, lat2: float, lng2: float) -> float:
-    r = 6371.0
-    phi1 = math.radians(lat1)
-    phi2 = math.radians(lat2)
-    dphi = math.radians(lat2 - lat1)
-    dlambda = math.radians(lng2 - lng1)
 
-    a = (math.sin(dphi / 2) ** 2) + math.cos(phi1) * math.cos(phi2) * (math.sin(dlambda / 2) ** 2)
-    c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-    return r * c
+_catalog = EventCatalog(
+    _load_feed_catalog,
+    ttl_s=FEED_CATALOG_TTL_S,
+    is_visible=lambda e: _is_feed_visible_status(_effective_status(e)),
+)
+
+
+def _invalidate_feed() -> None:
+    _catalog.invalidate()
+
+
+async def _membership_overlay(supa, user_id: str) -> Dict[str, Dict[str, Any]]:
+    r = await execute(
+        supa.table("event_memberships")
+        .select("*")
+        .eq("user_id", str(user_id))
+    )
+    return {str(m.get("event_id")): m for m in (r.data or [])}
+
+
+def _cooldown_seconds_left(m: Dict[str, Any]) -> Optional[int]:
+    try:
+        until = _parse_dt_utc(m.get("cooldown_until"))
+    except ValueError:
+        return None
+    if until is None:
+        return None
+    left = int((until - datetime.now(timezone.utc)).total_seconds())
+    return left if left > 0 else None
+
+
+def _with_overlay(
+    e: Dict[str, Any],
+    membership: Optional[Dict[str, Any]],
+    user_id: str,
+) -> Dict[str, Any]:
+    row = dict(e)
+    status = (membership or {}).get("status")
+    my_status = str(status).strip().lower() if status else None
+
+    row["my_status"] = my_status
+    row["is_joined"] = my_status == "joined"
+    row["cooldown_seconds"] = _cooldown_seconds_left(membership) if membership else None
+
+    # Pending request counts are host-only information
+    if str(e.get("host_user_id")) != str(user_id):
+        row["pending_requests_count"] = 0
+    return row
+
+
+def _membership_rows(overlay: Dict[str, Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [
+        {
+            "event_id": event_id,
+            "my_status": str(m.get("status")).strip().lower() if m.get("status") else None,
+            "cooldown_until": m.get("cooldown_until"),
+        }
+        for event_id, m in sorted(overlay.items())
+    ]
+
+
+def _overlay_visible(row: Dict[str, Any], include_full: bool) -> bool:
+    # Members keep seeing their Full events, like the per-user RPC
+    return include_full or _effective_status(row) != "Full" or bool(row.get("my_status"))
+
+
+async def _feed_rows(supa, user: Dict[str, Any], params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    if not FEED_CATALOG_CACHE:
+        r = await execute(supa.rpc("get_events_feed", params))
+        return r.data or []
+
+    snap = await _catalog.snapshot()
+    overlay = await _membership_overlay(supa, user["id"])
+    include_full = bool(params.get("include_full", True))
+
+    out = []
+    for e in snap.rows:
+        row = _with_overlay(e, overlay.get(str(e.get("id"))), user["id"])
+        if _overlay_visible(row, include_full):
+            out.append(row)
+    return out
+
+
+# ----------------------------
+# Pagination helpers
+# ----------------------------
+# Without limit/cursor the feeds keep returning a plain list (old clients).
+# With them they return EventPage, keyset-ordered by (starts_at, id), or by
+# (distance_km, id) for /nearby.
+
+_NO_START = datetime.max.replace(tzinfo=timezone.utc)
+
+
+def _starts_at_key(e: Dict[str, Any]) -> Tuple[datetime, str]:
+    try:
+        dt = _parse_dt_utc(e.get("starts_at"))
+    except ValueError:
+        dt = None
+    return (dt or _NO_START, str(e.get("id")))
+
+
+def _time_after(cursor: Optional[str]) -> Optional[Dict[str, Any]]:
+    after = decode_cursor(cursor, "t")
+    if after is None:
+        return None
+    # Anything else would page from the wrong place (or nowhere) silently
+    if not isinstance(after.get("s"), str) or not isinstance(after.get("i"), str):
+        raise HTTPException(status_code=400, detail={"code": "CURSOR_INVALID"})
+    return after
+
+
+def _keyset_params(limit: int, after: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if not FEED_KEYSET_PUSHDOWN:
+        return {}
+    params: Dict[str, Any] = {"p_limit": limit + 1}
+    if after:
+        params["p_after_starts_at"] = after.get("s")
+        params["p_after_id"] = after.get("i")
+    return params
+
+
+# Pushed-down pages still go through the feed-visible status filter here, so
+# each RPC page asks for some slack and short pages are topped up
+_PUSHDOWN_SLACK = 10
+_PUSHDOWN_MAX_ROUNDS = 4
+
+
+async def _pushdown_visible(
+    fetch: Callable[[Dict[str, Any]], Awaitable[List[Dict[str, Any]]]],
+    limit: int,
+    after: Optional[Dict[str, Any]],
+) -> Tuple[List[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    """
+    Feed-visible rows after `after`, at least limit+1 of them unless the RPC
+    runs out. Also returns where the scan stopped when it gave up early (every
+    round hidden rows), so the caller can still hand out a cursor.
+    """
+    batch = limit + 1 + _PUSHDOWN_SLACK
+    visible: List[Dict[str, Any]] = []
+    pos = after
+    for _ in range(_PUSHDOWN_MAX_ROUNDS):
+        rows = await fetch(_keyset_params(batch - 1, pos))
+        visible.extend(e for e in rows if _is_feed_visible_status(_effective_status(e)))
+        if len(visible) > limit or len(rows) < batch:
+            return visible, None
+        last = rows[-1]
+        pos = {"s": last.get("starts_at"), "i": str(last.get("id"))}
+    return visible, pos
+
+
+def _time_page(
+    rows: List[Dict[str, Any]],
+    limit: int,
+    after: Optional[Dict[str, Any]],
+    resume: Optional[Dict[str, Any]] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    after_key = _starts_at_key({"starts_at": after.get("s"), "id": after.get("i")}) if after else None
+    page, more = keyset_page(rows, _starts_at_key, after_key, limit)
+
+    next_cursor = None
+    if more and page:
+        last = page[-1]
+        next_cursor = encode_cursor("t", {"s": last.get("starts_at"), "i": str(last.get("id"))})
+    elif resume is not None:
+        # Short page, but the pushed-down scan stopped before the end
+        next_cursor = encode_cursor("t", resume)
+    return page, next_cursor
 
 
 # ----------------------------
 # NOTIFICATIONS (ADD)
 # ----------------------------
 
-def _notif_create(
+async def _notif_create(
     user_id: UUID,
     event_id: Optional[UUID],
     type_: str,
@@ -287,38 +501,27 @@ def _notif_create(
     meta: Optional[Dict[str, Any]] = None,
 ) -> None:
     # Use service role so we can notify other users (bypass RLS)
-    supabase_admin.table("notifications").insert(
-        {
-            "user_id": str(user_id),
-            "event_id": str(event_id) if event_id else None,
-            "type": type_,
-            "title": title,
-            "body": body,
-            "meta": meta or {},
-            "is_read": False,
-        }
-    ).execute()
+    await insert_notifications([notif_row(user_id, event_id, type_, title, body, meta)])
 
 
-def _notif_upsert_pending_requests(
+async def _notif_upsert_pending_requests(
     host_user_id: UUID,
     event_id: UUID,
     pending_count: int,
 ) -> None:
     # Dedup unread pending_requests per (host,event)
     existing = (
-        supabase_admin.table("notifications")
-        .select("id")
-        .eq("user_id", str(host_user_id))
-        .eq("event_id", str(event_id))
-        .eq("type", "pending_requests")
-        .eq("is_read", False)
-        .order("created_at", desc=True)
-        .limit(1)
-        .execute()
-        .data
-        or []
-    )
+        await execute(
+            supabase_admin.table("notifications")
+            .select("id")
+            .eq("user_id", str(host_user_id))
+            .eq("event_id", str(event_id))
+            .eq("type", "pending_requests")
+            .eq("is_read", False)
+            .order("created_at", desc=True)
+            .limit(1)
+        )
+    ).data or []
 
     title = "Pending requests"
     body = f"You have {int(pending_count)} pending request(s)."
@@ -327,16 +530,18 @@ def _notif_upsert_pending_requests(
 
     if existing:
         # Update the existing unread notif (no spam)
-        supabase_admin.table("notifications").update(
-            {
-                "title": title,
-                "body": body,
-                "meta": meta,
-                "created_at": now_iso,
-            }
-        ).eq("id", existing[0]["id"]).execute()
+        await execute(
+            supabase_admin.table("notifications").update(
+                {
+                    "title": title,
+                    "body": body,
+                    "meta": meta,
+                    "created_at": now_iso,
+                }
+            ).eq("id", existing[0]["id"])
+        )
     else:
-        _notif_create(
+        await _notif_create(
             user_id=host_user_id,
             event_id=event_id,
             type_="pending_requests",
@@ -346,26 +551,76 @@ def _notif_upsert_pending_requests(
         )
 
 
-def _get_event_row_for_notifs(supa, event_id: UUID) -> Optional[Dict[str, Any]]:
-    # Best-effort: never break main flow if this fails
+async def _event_title_admin(event_id: str) -> Optional[str]:
+    r = await execute(
+        supabase_admin.table("events").select("title").eq("id", str(event_id)).limit(1)
+    )
+    rows = r.data or []
+    return rows[0].get("title") if rows else None
+
+
+async def _enqueue_notif(kind: str, payload: Dict[str, Any]) -> None:
+    # Best-effort: never break main flow if the queue write fails
     try:
-        r = supa.rpc("get_event", {"p_event_id": str(event_id)}).execute()
-        if not r.data:
-            return None
-        return r.data[0] if isinstance(r.data, list) else r.data
+        await jobs.queue.enqueue(kind, payload)
     except Exception:
-        return None
+        logger.exception("Failed to enqueue %s for event %s", kind, payload.get("event_id"))
+
+
+@jobs.job_handler("event_member_notif")
+async def _job_event_member_notif(p: Dict[str, Any]) -> None:
+    # body is a template: {event_title} is filled in here, off the request path
+    if "event_title" not in p:
+        p["event_title"] = await _event_title_admin(p["event_id"]) or p["fallback_title"]
+    await _notif_create(
+        user_id=p["user_id"],
+        event_id=p["event_id"],
+        type_=p["type"],
+        title=p["title"],
+        body=p["body"].format(event_title=p["event_title"]),
+        meta=p.get("meta"),
+    )
+
+
+@jobs.job_handler("event_cancelled_notifs")
+async def _job_event_cancelled_notifs(p: Dict[str, Any]) -> None:
+    event_id = p["event_id"]
+    if "event_title" not in p:
+        p["event_title"] = await _event_title_admin(event_id) or "An event"
+
+    if "user_ids" not in p:
+        a = await execute(
+            supabase_admin.table("event_memberships")
+            .select("user_id")
+            .eq("event_id", str(event_id))
+            .eq("status", "joined")
+        )
+        p["user_ids"] = [row["user_id"] for row in (a.data or []) if row.get("user_id")]
+
+    # One bulk insert per chunk instead of one round trip per player
+    report = await broadcast(
+        p["user_ids"],
+        event_id,
+        "event_cancelled",
+        "Event cancelled",
+        f'"{p["event_title"]}" was cancelled.',
+    )
+    if report["failed_user_ids"]:
+        # Retry only the players that didn't get it
+        p["user_ids"] = report["failed_user_ids"]
+        raise RuntimeError(
+            f"{len(report['failed_user_ids'])}/{report['requested']} notifications failed"
+        )
     
 
-def _count_pending_requests_admin(event_id: UUID) -> int:
+async def _count_pending_requests_admin(event_id: UUID) -> int:
     try:
-        r = (
+        r = await execute(
             supabase_admin
             .table("event_memberships")
             .select("id", count="exact")
             .eq("event_id", str(event_id))
             .eq("status", "pending")
-            .execute()
         )
         return r.count or 0
     except Exception:
@@ -377,146 +632,303 @@ def _count_pending_requests_admin(event_id: UUID) -> int:
 # Routes
 # ----------------------------
 
-@router.get("", response_model=List[EventOut])
-def get_events(
+@router.get("", response_model=Union[List[EventOut], EventPage])
+async def get_events(
     include_full: bool = True,
     lat: Optional[float] = Query(None),
     lng: Optional[float] = Query(None),
+    limit: Optional[int] = Query(None, ge=1, le=FEED_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
     user=Depends(get_current_user),
 ):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
 
+    paged = limit is not None or cursor is not None
+    limit = limit or FEED_PAGE_DEFAULT
+    after = _time_after(cursor)
+
     try:
         params: Dict[str, Any] = {"include_full": include_full}
-        r = supa.rpc("get_events_feed", params).execute()
-        rows = r.data or []
-
-        out: List[Dict[str, Any]] = []
-        for e in rows:
-            status = _effective_status(e)
-            if not _is_feed_visible_status(status):
-                continue
-
-            mapped = _event_out_from_row(e, using_user_feed=True)
-
-            if lat is not None and lng is not None:
-                ev_lat = e.get("lat")
-                ev_lng = e.get("lng")
-                if ev_lat is not None and ev_lng is not None:
-                    try:
-                        dist = _haversine_km(float(lat), float(lng), float(ev_lat), float(ev_lng))
-                        mapped["distance_km"] = dist
-                    except Exception:
-                        pass
-
-            out.append(mapped)
+        resume = None
+        if paged and FEED_KEYSET_PUSHDOWN and not FEED_CATALOG_CACHE:
+            visible, resume = await _pushdown_visible(
+                lambda kp: _feed_rows(supa, user, {**params, **kp}), limit, after
+            )
+        else:
+            rows = await _feed_rows(supa, user, params)
+            visible = [e for e in rows if _is_feed_visible_status(_effective_status(e))]
+
+        next_cursor = None
+        if paged:
+            visible, next_cursor = _time_page(visible, limit, after, resume)
+
+        out: List[Dict[str, Any]] = [
+            _event_out_from_row(e, using_user_feed=True) for e in visible
+        ]
+
+        if lat is not None and lng is not None:
+            # One batch call for the whole page instead of a per-row loop
+            dists = batch_haversine_km(
+                float(lat),
+                float(lng),
+                [e.get("lat") for e in visible],
+                [e.get("lng") for e in visible],
+            )
+            for mapped, dist in zip(out, dists):
+                if dist is not None:
+                    mapped["distance_km"] = dist
 
-        return out
+        if paged:
+            return trusted({"items": out, "next_cursor": next_cursor})
+        return trusted(out)
 
     except APIError as e:
         raise_http_for_api_error(e)
 
 
-@router.get("/nearby", response_model=List[EventOut])
-def get_events_nearby(
+@router.get("/nearby", response_model=Union[List[EventOut], EventPage])
+async def get_events_nearby(
     lat: float = Query(...),
     lng: float = Query(...),
     radius_km: float = Query(50.0, ge=1.0, le=500.0),
     include_full: bool = True,
+    limit: Optional[int] = Query(None, ge=1, le=FEED_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
     user=Depends(get_current_user),
 ):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
 
+    paged = limit is not None or cursor is not None
+    limit = limit or FEED_PAGE_DEFAULT
+    after = decode_cursor(cursor, "d")
     try:
-        params: Dict[str, Any] = {"include_full": include_full}
-        r = supa.rpc("get_events_feed", params).execute()
-        rows = r.data or []
+        after_key = (float(after["d"]), str(after["i"])) if after else None
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail={"code": "CURSOR_INVALID"})
 
-        out: List[Dict[str, Any]] = []
-        for e in rows:
-            if not _is_feed_visible_status(_effective_status(e)):
-                continue
+    try:
+        params: Dict[str, Any] = {"include_full": include_full}
+        # First page only needs the top limit+1; later pages resume after the cursor
+        k = limit + 1 if paged and after_key is None else None
+
+        if FEED_CATALOG_CACHE:
+            # Long-lived grid over the shared catalog; overlay only the hits
+            snap = await _catalog.snapshot()
+            overlay = await _membership_overlay(supa, user["id"])
+            hits = []
+            for dist, e in snap.index.nearest(float(lat), float(lng), float(radius_km)):
+                row = _with_overlay(e, overlay.get(str(e.get("id"))), user["id"])
+                if _overlay_visible(row, include_full):
+                    hits.append((dist, row))
+            if k is not None:
+                hits = hits[:k]
+        else:
+            if FEED_RADIUS_PUSHDOWN:
+                # Postgres prefilters; the grid below still does the exact cut
+                params.update({"p_lat": lat, "p_lng": lng, "p_radius_km": radius_km})
+            r = await execute(supa.rpc("get_events_feed", params))
+            rows = r.data or []
+
+            index = GridIndex.from_rows(
+                e for e in rows if _is_feed_visible_status(_effective_status(e))
+            )
+            hits = index.nearest(float(lat), float(lng), float(radius_km), k=k)
 
-            ev_lat = e.get("lat")
-            ev_lng = e.get("lng")
-            if ev_lat is None or ev_lng is None:
-                continue
+        next_cursor = None
+        if paged:
+            def dist_key(h):
+                return (h[0], str(h[1].get("id")))
 
-            try:
-                dist = _haversine_km(float(lat), float(lng), float(ev_lat), float(ev_lng))
-            except Exception:
-                continue
+            hits, more = keyset_page(hits, dist_key, after_key, limit)
+            if more and hits:
+                last_d, last_e = hits[-1]
+                next_cursor = encode_cursor("d", {"d": last_d, "i": str(last_e.get("id"))})
 
-            if dist <= float(radius_km):
-                mapped = _event_out_from_row(e, using_user_feed=True)
-                mapped["distance_km"] = dist
-                out.append(mapped)
+        out: List[Dict[str, Any]] = []
+        for dist, e in hits:
+            mapped = _event_out_from_row(e, using_user_feed=True)
+            mapped["distance_km"] = dist
+            out.append(mapped)
 
-        out.sort(key=lambda x: x.get("distance_km", 999999))
-        return out
+        if paged:
+            return trusted({"items": out, "next_cursor": next_cursor})
+        return trusted(out)
 
     except APIError as e:
         raise_http_for_api_error(e)
 
 
-@router.get("/all", response_model=List[EventOut])
-def get_all_events(user=Depends(get_current_user)):
+@router.get("/all", response_model=Union[List[EventOut], EventPage])
+async def get_all_events(
+    limit: Optional[int] = Query(None, ge=1, le=FEED_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    user=Depends(get_current_user),
+):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
-    try:
-        r = supa.rpc("get_events", {}).execute()
-        rows = r.data or []
 
-        out: List[Dict[str, Any]] = []
-        for e in rows:
-            if not _is_feed_visible_status(_effective_status(e)):
-                continue
-            out.append(_event_out_from_row(e, using_user_feed=True))
-        return out
+    paged = limit is not None or cursor is not None
+    limit = limit or FEED_PAGE_DEFAULT
+    after = _time_after(cursor)
+
+    try:
+        async def fetch(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+            r = await execute(supa.rpc("get_events", params))
+            return r.data or []
+
+        resume = None
+        if paged and FEED_KEYSET_PUSHDOWN:
+            visible, resume = await _pushdown_visible(fetch, limit, after)
+        else:
+            visible = [e for e in await fetch({}) if _is_feed_visible_status(_effective_status(e))]
+        if not paged:
+            return trusted([_event_out_from_row(e, using_user_feed=True) for e in visible])
+
+        page, next_cursor = _time_page(visible, limit, after, resume)
+        return trusted({
+            "items": [_event_out_from_row(e, using_user_feed=True) for e in page],
+            "next_cursor": next_cursor,
+        })
 
     except APIError as e:
         raise_http_for_api_error(e)
 
 
-@router.get("/mine", response_model=List[EventOut])
-def get_my_events(user=Depends(get_current_user)):
+@router.get("/mine", response_model=Union[List[EventOut], EventPage])
+async def get_my_events(
+    limit: Optional[int] = Query(None, ge=1, le=FEED_PAGE_MAX),
+    cursor: Optional[str] = Query(None),
+    user=Depends(get_current_user),
+):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
 
+    paged = limit is not None or cursor is not None
+    limit = limit or FEED_PAGE_DEFAULT
+    after = _time_after(cursor)
+
     try:
         # ✅ FIX: call get_my_events(p_user_id) so Ended events appear
-        r = supa.rpc(
-            "get_my_events",
-            {"p_user_id": str(user["id"])},
-        ).execute()
+        params: Dict[str, Any] = {"p_user_id": str(user["id"])}
+        if paged:
+            params.update(_keyset_params(limit, after))
+        r = await execute(supa.rpc("get_my_events", params))
 
         rows = r.data or []
-        return [_event_out_from_row(e, using_user_feed=True) for e in rows]
+        if not paged:
+            return trusted([_event_out_from_row(e, using_user_feed=True) for e in rows])
+
+        page, next_cursor = _time_page(rows, limit, after)
+        return trusted({
+            "items": [_event_out_from_row(e, using_user_feed=True) for e in page],
+            "next_cursor": next_cursor,
+        })
 
     except APIError as e:
         raise_http_for_api_error(e)
 
 
+@router.get("/changes", response_model=EventChangesOut)
+async def get_event_changes(
+    since: Optional[str] = Query(None),
+    include_full: bool = True,
+    user=Depends(get_current_user),
+):
+    """
+    Delta sync for a locally kept feed. Pass back `next_since` from the
+    previous call; without it (or when it is too old) the answer is a reset.
+    Served from the shared catalog, so only available with FEED_CATALOG_CACHE=1.
+    """
+    if not FEED_CATALOG_CACHE:
+        # The service-role catalog is not cleared for per-user RLS yet
+        raise HTTPException(status_code=404, detail={"code": "CHANGES_UNAVAILABLE"})
+
+    token = _require_token(user)
+    supa = get_supabase_for_user(token)
+    prev = decode_cursor(since, "s")
+
+    try:
+        snap = await _catalog.snapshot()
+        overlay = await _membership_overlay(supa, user["id"])
+    except APIError as e:
+        raise_http_for_api_error(e)
+
+    memberships = _membership_rows(overlay)
+    m_digest = hashlib.blake2b(
+        json.dumps(memberships, separators=(",", ":"), default=str).encode("utf-8"),
+        digest_size=8,
+    ).hexdigest()
+
+    changed = None
+    # Full events stay visible to members only: a membership change can flip
+    # rows that did not change in the catalog, so that case starts over too
+    if (
+        prev
+        and prev.get("e") == _catalog.epoch
+        and prev.get("f") == include_full
+        and (include_full or prev.get("m") == m_digest)
+    ):
+        try:
+            changed = _catalog.changes_since(int(prev.get("q")), snap.seq)
+        except (TypeError, ValueError):
+            changed = None
+    reset = changed is None
+
+    upserts: List[Dict[str, Any]] = []
+    removed: List[Dict[str, Any]] = []
+    if reset:
+        for e in snap.rows:
+            row = _with_overlay(e, overlay.get(str(e.get("id"))), user["id"])
+            if _overlay_visible(row, include_full):
+                upserts.append(_event_out_from_row(row, using_user_feed=True))
+    else:
+        for event_id in sorted(changed):
+            e = snap.by_id.get(event_id)
+            if e is not None:
+                row = _with_overlay(e, overlay.get(event_id), user["id"])
+                if _overlay_visible(row, include_full):
+                    upserts.append(_event_out_from_row(row, using_user_feed=True))
+                else:
+                    removed.append({"id": event_id, "status": _effective_status(e)})
+                continue
+            # Tombstone: left the feed-visible statuses, or gone entirely
+            hidden = snap.hidden.get(event_id)
+            removed.append({
+                "id": event_id,
+                "status": _effective_status(hidden) if hidden else "Removed",
+            })
+
+    return trusted({
+        "reset": reset,
+        "upserts": upserts,
+        "removed": removed,
+        "memberships": memberships if reset or prev.get("m") != m_digest else None,
+        "next_since": encode_cursor(
+            "s", {"e": _catalog.epoch, "q": snap.seq, "m": m_digest, "f": include_full}
+        ),
+    })
+
+
 @router.get("/{event_id}/requests")
-def get_event_requests(event_id: UUID, user=Depends(get_current_user)):
+async def get_event_requests(event_id: UUID, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
 
     try:
-        r = supa.rpc("get_event_requests", {"p_event_id": str(event_id)}).execute()
+        r = await read_rpc(supa, user, "get_event_requests", {"p_event_id": str(event_id)})
         return r.data or []
     except APIError as e:
         raise_http_for_api_error(e)
 
 
 @router.get("/{event_id}", response_model=EventOut)
-def get_event(event_id: UUID, user=Depends(get_current_user)):
+async def get_event(event_id: UUID, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc("get_event", {"p_event_id": str(event_id)}).execute()
+        r = await read_rpc(supa, user, "get_event", {"p_event_id": str(event_id)})
         if not r.data:
             raise HTTPException(status_code=404, detail={"code": "EVENT_NOT_FOUND"})
         row = r.data[0] if isinstance(r.data, list) else r.data
@@ -526,27 +938,85 @@ def get_event(event_id: UUID, user=Depends(get_current_user)):
 
 
 @router.get("/{event_id}/attendees")
-def get_attendees(event_id: UUID, user=Depends(get_current_user)):
+async def get_attendees(event_id: UUID, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc("get_event_attendees", {"p_event_id": str(event_id)}).execute()
+        r = await read_rpc(supa, user, "get_event_attendees", {"p_event_id": str(event_id)})
         return r.data or []
     except APIError as e:
         raise_http_for_api_error(e)
 
 
+@router.get("/{event_id}/full", response_model=EventFullOut)
+async def get_event_full(event_id: UUID, user=Depends(get_current_user)):
+    """
+    Event detail screen in one request: event and attendees fetched
+    concurrently, plus pending requests for the host. The ETag middleware covers the
+    combined body, so a 304 means none of the three changed.
+    """
+    token = _require_token(user)
+    supa = get_supabase_for_user(token)
+    p = {"p_event_id": str(event_id)}
+
+    # Pending requests are host-only. Fetch them alongside the rest when the
+    # loaded catalog already says the caller hosts this event; otherwise only
+    # once get_event has confirmed it.
+    uid = str(user.get("id"))
+    cached = _catalog.peek(str(event_id))
+    hinted_host = cached is not None and str(cached.get("host_user_id")) == uid
+
+    calls = [
+        read_rpc(supa, user, "get_event", p),
+        read_rpc(supa, user, "get_event_attendees", p),
+    ]
+    if hinted_host:
+        calls.append(read_rpc(supa, user, "get_event_requests", p))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    ev_res, att_res = results[0], results[1]
+
+    for res in (ev_res, att_res):
+        if isinstance(res, APIError):
+            raise_http_for_api_error(res)
+        if isinstance(res, BaseException):
+            raise res
+
+    if not ev_res.data:
+        raise HTTPException(status_code=404, detail={"code": "EVENT_NOT_FOUND"})
+    row = ev_res.data[0] if isinstance(ev_res.data, list) else ev_res.data
+
+    requests = None
+    if str(row.get("host_user_id")) == uid:
+        if hinted_host:
+            req_res = results[2]
+            if isinstance(req_res, APIError):
+                raise_http_for_api_error(req_res)
+            if isinstance(req_res, BaseException):
+                raise req_res
+        else:
+            try:
+                req_res = await read_rpc(supa, user, "get_event_requests", p)
+            except APIError as e:
+                raise_http_for_api_error(e)
+        requests = req_res.data or []
+
+    return trusted({
+        "event": _event_out_from_row(row, using_user_feed=True),
+        "attendees": att_res.data or [],
+        "requests": requests,
+    })
+
+
 @router.patch("/{event_id}", response_model=EventOut)
-def update_event(event_id: UUID, body: EditEventIn, user=Depends(get_current_user)):
+async def update_event(event_id: UUID, body: EditEventIn, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
 
-    event_res = (
+    event_res = await execute(
         supa.table("events")
         .select("status, host_user_id")
         .eq("id", str(event_id))
         .single()
-        .execute()
     )
 
     if not event_res.data:
@@ -569,7 +1039,7 @@ def update_event(event_id: UUID, body: EditEventIn, user=Depends(get_current_use
     if "format_slug" in updates:
         slug = updates.get("format_slug")
         if slug is not None:
-            updates["format_id"] = _format_id_from_slug(supa, str(slug))
+            updates["format_id"] = await _format_id_from_slug(str(slug))
         del updates["format_slug"]
 
     # ✅ normalize host_notes + enforce max length
@@ -589,16 +1059,17 @@ def update_event(event_id: UUID, body: EditEventIn, user=Depends(get_current_use
             updates["proxies_policy"] = s if s else None
 
     if not updates:
-        r = supa.rpc("get_event", {"p_event_id": str(event_id)}).execute()
+        r = await execute(supa.rpc("get_event", {"p_event_id": str(event_id)}))
         if not r.data:
             raise HTTPException(status_code=404, detail={"code": "EVENT_NOT_FOUND"})
         row = r.data[0] if isinstance(r.data, list) else r.data
         return _event_out_from_row(row, using_user_feed=True)
 
     try:
-        supa.table("events").update(updates).eq("id", str(event_id)).execute()
+        await execute(supa.table("events").update(updates).eq("id", str(event_id)))
+        _invalidate_feed()
 
-        r = supa.rpc("get_event", {"p_event_id": str(event_id)}).execute()
+        r = await execute(supa.rpc("get_event", {"p_event_id": str(event_id)}))
         if not r.data:
             raise HTTPException(status_code=404, detail={"code": "EVENT_NOT_FOUND"})
         row = r.data[0] if isinstance(r.data, list) else r.data
@@ -615,27 +1086,30 @@ def update_event(event_id: UUID, body: EditEventIn, user=Depends(get_current_use
 # ----------------------------
 
 @router.post("/{event_id}/accept")
-def accept_attendee(event_id: UUID, body: AcceptIn, user=Depends(get_current_user)):
+async def accept_attendee(event_id: UUID, body: AcceptIn, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc(
-            "accept_attendee",
-            {"p_event_id": str(event_id), "p_user_id": str(body.user_id)},
-        ).execute()
-
-        # NOTIFICATIONS (ADD): Request Accepted
-        try:
-            ev = _get_event_row_for_notifs(supa, event_id) or {}
-            _notif_create(
-                user_id=body.user_id,
-                event_id=event_id,
-                type_="request_accepted",
-                title="Request accepted",
-                body=f'You were accepted into "{ev.get("title", "an event")}".',
+        r = await execute(
+            supa.rpc(
+                "accept_attendee",
+                {"p_event_id": str(event_id), "p_user_id": str(body.user_id)},
             )
-        except Exception:
-            pass
+        )
+        _invalidate_feed()
+
+        # NOTIFICATIONS (ADD): Request Accepted (delivered by the job queue)
+        await _enqueue_notif(
+            "event_member_notif",
+            {
+                "user_id": str(body.user_id),
+                "event_id": str(event_id),
+                "type": "request_accepted",
+                "title": "Request accepted",
+                "body": 'You were accepted into "{event_title}".',
+                "fallback_title": "an event",
+            },
+        )
 
         return r.data
     except APIError as e:
@@ -645,32 +1119,35 @@ def accept_attendee(event_id: UUID, body: AcceptIn, user=Depends(get_current_use
 
 
 @router.post("/{event_id}/reject")
-def reject_attendee(event_id: UUID, body: RejectIn, user=Depends(get_current_user)):
+async def reject_attendee(event_id: UUID, body: RejectIn, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc(
-            "reject_attendee",
+        r = await execute(
+            supa.rpc(
+                "reject_attendee",
+                {
+                    "p_event_id": str(event_id),
+                    "p_user_id": str(body.user_id),
+                    "p_cooldown_minutes": int(body.cooldown_minutes),
+                },
+            )
+        )
+        _invalidate_feed()
+
+        # NOTIFICATIONS (ADD): Request Declined (delivered by the job queue)
+        await _enqueue_notif(
+            "event_member_notif",
             {
-                "p_event_id": str(event_id),
-                "p_user_id": str(body.user_id),
-                "p_cooldown_minutes": int(body.cooldown_minutes),
+                "user_id": str(body.user_id),
+                "event_id": str(event_id),
+                "type": "request_declined",
+                "title": "Request declined",
+                "body": 'Your request was declined for "{event_title}".',
+                "fallback_title": "an event",
+                "meta": {"cooldown_minutes": int(body.cooldown_minutes)},
             },
-        ).execute()
-
-        # NOTIFICATIONS (ADD): Request Declined
-        try:
-            ev = _get_event_row_for_notifs(supa, event_id) or {}
-            _notif_create(
-                user_id=body.user_id,
-                event_id=event_id,
-                type_="request_declined",
-                title="Request declined",
-                body=f'Your request was declined for "{ev.get("title", "an event")}".',
-                meta={"cooldown_minutes": int(body.cooldown_minutes)},
-            )
-        except Exception:
-            pass
+        )
 
         return r.data
     except APIError as e:
@@ -680,7 +1157,7 @@ def reject_attendee(event_id: UUID, body: RejectIn, user=Depends(get_current_use
 
 
 @router.post("/{event_id}/join")
-def join_event(event_id: UUID, user=Depends(get_current_user)):
+async def join_event(event_id: UUID, user=Depends(get_current_user)):
     print("JOIN ENDPOINT RUNNING - NEW VERSION")
 
     user_id = user.get("sub") or user.get("id")
@@ -691,7 +1168,8 @@ def join_event(event_id: UUID, user=Depends(get_current_user)):
 
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc("join_event", {"p_event_id": str(event_id)}).execute()
+        r = await execute(supa.rpc("join_event", {"p_event_id": str(event_id)}))
+        _invalidate_feed()
         return r.data
     except APIError as e:
         raise_http_for_api_error(e)
@@ -700,11 +1178,12 @@ def join_event(event_id: UUID, user=Depends(get_current_user)):
 
 
 @router.post("/{event_id}/leave")
-def leave_event(event_id: UUID, user=Depends(get_current_user)):
+async def leave_event(event_id: UUID, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc("leave_event", {"p_event_id": str(event_id)}).execute()
+        r = await execute(supa.rpc("leave_event", {"p_event_id": str(event_id)}))
+        _invalidate_feed()
         return r.data
     except APIError as e:
         raise_http_for_api_error(e)
@@ -713,37 +1192,15 @@ def leave_event(event_id: UUID, user=Depends(get_current_user)):
 
 
 @router.post("/{event_id}/cancel")
-def cancel_event(event_id: UUID, user=Depends(get_current_user)):
+async def cancel_event(event_id: UUID, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc("cancel_event", {"p_event_id": str(event_id)}).execute()
+        r = await execute(supa.rpc("cancel_event", {"p_event_id": str(event_id)}))
+        _invalidate_feed()
 
-        # NOTIFICATIONS (ADD): Event Cancelled -> notify all attendees
-        try:
-            ev = _get_event_row_for_notifs(supa, event_id) or {}
-            title = "Event cancelled"
-            body_txt = f'"{ev.get("title", "An event")}" was cancelled.'
-
-            a = supa.rpc("get_event_attendees", {"p_event_id": str(event_id)}).execute()
-            attendees = a.data or []
-
-            for row in attendees:
-                uid = row.get("user_id") or row.get("id")
-                if not uid:
-                    continue
-                try:
-                    _notif_create(
-                        user_id=UUID(str(uid)),
-                        event_id=event_id,
-                        type_="event_cancelled",
-                        title=title,
-                        body=body_txt,
-                    )
-                except Exception:
-                    continue
-        except Exception:
-            pass
+        # NOTIFICATIONS (ADD): Event Cancelled -> notify all attendees (job queue)
+        await _enqueue_notif("event_cancelled_notifs", {"event_id": str(event_id)})
 
         return r.data
     except APIError as e:
@@ -753,31 +1210,34 @@ def cancel_event(event_id: UUID, user=Depends(get_current_user)):
 
 
 @router.post("/{event_id}/kick")
-def kick_attendee(event_id: UUID, body: KickIn, user=Depends(get_current_user)):
+async def kick_attendee(event_id: UUID, body: KickIn, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
-        r = supa.rpc(
-            "kick_attendee",
+        r = await execute(
+            supa.rpc(
+                "kick_attendee",
+                {
+                    "p_event_id": str(event_id),
+                    "p_user_id": str(body.user_id),
+                },
+            )
+        )
+        _invalidate_feed()
+
+        # NOTIFICATIONS (ADD): Kicked (delivered by the job queue)
+        await _enqueue_notif(
+            "event_member_notif",
             {
-                "p_event_id": str(event_id),
-                "p_user_id": str(body.user_id),
+                "user_id": str(body.user_id),
+                "event_id": str(event_id),
+                "type": "kicked",
+                "title": "Removed from event",
+                "body": 'You were removed from "{event_title}".',
+                "fallback_title": "an event",
+                "meta": {"cooldown_minutes": int(body.cooldown_minutes)},
             },
-        ).execute()
-
-        # NOTIFICATIONS (ADD): Kicked
-        try:
-            ev = _get_event_row_for_notifs(supa, event_id) or {}
-            _notif_create(
-                user_id=body.user_id,
-                event_id=event_id,
-                type_="kicked",
-                title="Removed from event",
-                body=f'You were removed from "{ev.get("title", "an event")}".',
-                meta={"cooldown_minutes": int(body.cooldown_minutes)},
-            )
-        except Exception:
-            pass
+        )
 
         return r.data
     except APIError as e:
@@ -787,7 +1247,7 @@ def kick_attendee(event_id: UUID, body: KickIn, user=Depends(get_current_user)):
 
 
 @router.patch("/{event_id}/notes")
-def update_notes(event_id: UUID, body: NotesIn, user=Depends(get_current_user)):
+async def update_notes(event_id: UUID, body: NotesIn, user=Depends(get_current_user)):
     token = _require_token(user)
     supa = get_supabase_for_user(token)
     try:
@@ -799,10 +1259,13 @@ def update_notes(event_id: UUID, body: NotesIn, user=Depends(get_current_user)):
                 detail={"code": "HOST_NOTES_TOO_LONG", "max_length": HOST_NOTES_MAX},
             )
 
-        r = supa.rpc(
-            "update_event_notes",
-            {"p_event_id": str(event_id), "p_host_notes": host_notes},
-        ).execute()
+        r = await execute(
+            supa.rpc(
+                "update_event_notes",
+                {"p_event_id": str(event_id), "p_host_notes": host_notes},
+            )
+        )
+        _invalidate_feed()
         return r.data
 
     except APIError as e:
@@ -812,7 +1275,7 @@ def update_notes(event_id: UUID, body: NotesIn, user=Depends(get_current_user)):
 
 
 @router.post("")
-def create_event(payload: Dict[str, Any], user=Depends(get_current_user)):
+async def create_event(payload: Dict[str, Any], user=Depends(get_current_user)):
     supa = _get_supa(user)
 
     host_notes = _normalize_notes(payload.get("host_notes"))
@@ -831,6 +1294,13 @@ def create_event(payload: Dict[str, Any], user=Depends(get_current_user)):
             status_code=422,
             detail={"code": "FORMAT_SLUG_REQUIRED"},
         )
+    # Reject unknown formats here instead of after a round trip to the RPC
+    try:
+        await _format_id_from_slug(str(format_slug))
+    except HTTPException as e:
+        if e.status_code != 503:
+            raise
+        # Registry down (already logged): create_event still checks the slug
 
     params = {
         "p_title": payload["title"],
@@ -850,7 +1320,8 @@ def create_event(payload: Dict[str, Any], user=Depends(get_current_user)):
     }
 
     try:
-        r = supa.rpc("create_event", params).execute()
+        r = await execute(supa.rpc("create_event", params))
+        _invalidate_feed()
         return r.data
     except APIError as e:
         raise_http_for_api_error(e)
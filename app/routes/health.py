@@ -2,8 +2,7 @@ from fastapi import APIRouter
 
 router = APIRouter(tags=["health"])
 
+# Public liveness probe only; internal stats live under /admin/stats
 @router.get("/health")
-def health():
+async def health():
     return {"status": "ok"}
-
-
@@ -1,13 +1,15 @@
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from postgrest.exceptions import APIError
 
 from app.auth import get_current_user
-from app.supabase_user_client import get_supabase_for_user
+from app.supabase_user_client import execute, get_supabase_for_user
 from app.supabase_client import supabase_admin
 from app.http_errors import raise_http_for_api_error
+from app.profile_cache import invalidate_profile
 
 import logging
 
@@ -30,7 +32,7 @@ def _get_supabase(current_user: dict):
 # --------------------------------------------------
 
 @router.get("/me")
-def me(current_user: dict = Depends(get_current_user)):
+async def me(current_user: dict = Depends(get_current_user)):
     return {
         "user": {
             "id": current_user["id"],
@@ -51,7 +53,7 @@ class UpdateMyProfileIn(BaseModel):
 
 
 @router.patch("/me/profile")
-def update_my_profile(
+async def update_my_profile(
     payload: UpdateMyProfileIn,
     current_user: dict = Depends(get_current_user),
 ):
@@ -80,20 +82,24 @@ def update_my_profile(
     }
 
     try:
-        supabase.table("profiles").upsert(
-            body,
-            on_conflict="id",
-        ).execute()
+        await execute(
+            supabase.table("profiles").upsert(
+                body,
+                on_conflict="id",
+            )
+        )
     except APIError as e:
         raise_http_for_api_error(e)
+    finally:
+        # Even a failed upsert may have landed; drop the cached public profile
+        invalidate_profile(current_user["id"])
 
     try:
-        res = (
+        res = await execute(
             supabase.table("profiles")
             .select("id,nickname,avatar_url,bio,mtg_arena_username")
             .eq("id", current_user["id"])
             .single()
-            .execute()
         )
     except APIError as e:
         raise_http_for_api_error(e)
@@ -118,13 +124,15 @@ async def delete_account(current_user: dict = Depends(get_current_user)):
 
     try:
         # 1. Atomic delete inside Postgres
-        supabase_admin.rpc(
-            "delete_user_atomic",
-            {"p_user_id": user_id}
-        ).execute()
+        await execute(
+            supabase_admin.rpc(
+                "delete_user_atomic",
+                {"p_user_id": user_id}
+            )
+        )
 
         # 2. Delete auth user (outside DB transaction)
-        supabase_admin.auth.admin.delete_user(user_id)
+        await run_in_threadpool(supabase_admin.auth.admin.delete_user, user_id)
 
         return {"success": True}
 
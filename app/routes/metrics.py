@@ -0,0 +1,54 @@
+import hmac
+from typing import Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app import jobs, metrics
+from app.auth import claims_cache_stats
+from app.coalesce import coalesce_stats
+from app.config import METRICS_TOKEN
+from app.notif_hub import hub
+
+router = APIRouter(tags=["metrics"])
+
+
+def _jobs() -> Dict[metrics.Labels, Optional[float]]:
+    s = jobs.queue.stats()
+    return {("queued",): s["depth"], ("in_flight",): s["in_flight"], ("dead",): s["dead_letter"]}
+
+
+def _job_latency() -> Dict[metrics.Labels, Optional[float]]:
+    s = jobs.queue.stats()
+    return {("0.5",): s["latency_ms_p50"], ("0.95",): s["latency_ms_p95"]}
+
+
+metrics.register(metrics.Collected(
+    "untapgo_jobs", "Background jobs by state.", _jobs, ("state",),
+))
+metrics.register(metrics.Collected(
+    "untapgo_job_latency_ms", "Enqueue-to-done latency over the last 1000 jobs.", _job_latency, ("quantile",),
+))
+metrics.register(metrics.Collected(
+    "untapgo_sse_connections", "Open /notifications/stream connections.",
+    lambda: {(): hub.stats()["connections"]},
+))
+metrics.register(metrics.Collected(
+    "untapgo_jwt_claims_cache_size", "Verified tokens held in the claims cache.",
+    lambda: {(): claims_cache_stats()["size"]},
+))
+metrics.register(metrics.Collected(
+    "untapgo_coalesced_reads_total", "Read RPC callers served by another caller's in-flight call.",
+    lambda: {(): coalesce_stats()["merged"]}, kind="counter",
+))
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics(authorization: Optional[str] = Header(default=None)):
+    if not METRICS_TOKEN:
+        # Fail closed, like /admin without ADMIN_TOKEN
+        raise HTTPException(status_code=404, detail="Not Found")
+    expected = f"Bearer {METRICS_TOKEN}"
+    if not authorization or not hmac.compare_digest(authorization, expected):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
@@ -1,20 +1,27 @@
 from __future__ import annotations
 
-from typing import Any, Dict, List, Optional
+import asyncio
+import json
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from postgrest.exceptions import APIError
 
 from app.auth import get_current_user
+from app.config import SSE_PING_S
 from app.http_errors import raise_http_for_api_error
-from app.supabase_user_client import get_supabase_for_user
+from app.notif_hub import HubFull, hub
+from app.supabase_user_client import execute, get_supabase_for_user
+from app.unread import add_unread, forget_unread, set_unread, unread_count as _unread_count
 
 router = APIRouter(prefix="/notifications", tags=["notifications"])
 
 
 @router.get("")
-def list_notifications(
+async def list_notifications(
     unread_only: bool = Query(False),
     limit: int = Query(50, ge=1, le=200),
     user=Depends(get_current_user),
@@ -37,17 +44,11 @@ def list_notifications(
         if unread_only:
             q = q.eq("is_read", False)
 
-        rows = q.execute().data or []
+        rows = (await execute(q)).data or []
 
-        # unread count (cheap separate query)
-        c = (
-            supa.table("notifications")
-            .select("id", count="exact")
-            .eq("user_id", str(user["id"]))
-            .eq("is_read", False)
-            .execute()
-        )
-        unread_count = int(getattr(c, "count", 0) or 0)
+        # unread count: always recounted here, so opening the list corrects
+        # the cached badge after reads / inserts made outside this process
+        unread_count = await _unread_count(supa, user["id"], fresh=True)
 
         return {"unread_count": unread_count, "items": rows}
 
@@ -55,8 +56,104 @@ def list_notifications(
         raise_http_for_api_error(e)
 
 
+@router.get("/unread_count")
+async def get_unread_count(user=Depends(get_current_user)):
+    token = user.get("access_token")
+    if not token:
+        raise HTTPException(status_code=401, detail={"code": "AUTH_REQUIRED"})
+    supa = get_supabase_for_user(token)
+
+    try:
+        return {"unread_count": await _unread_count(supa, user["id"])}
+
+    except APIError as e:
+        raise_http_for_api_error(e)
+
+
+def _sse_frame(event: str, data: Dict[str, Any], event_id: Optional[str] = None) -> str:
+    head = f"id: {event_id}\n" if event_id else ""
+    return f"{head}event: {event}\ndata: {json.dumps(data, separators=(',', ':'), default=str)}\n\n"
+
+
+async def _sse_events(
+    user_id: str,
+    last_event_id: Optional[str],
+    expires_at: Optional[float],
+) -> AsyncIterator[str]:
+    # Subscribe inside the generator so its finally always unsubscribes.
+    # replay + subscribe with no await in between: nothing published is missed
+    backlog = hub.replay(user_id, last_event_id)
+    try:
+        sub = hub.subscribe(user_id)
+    except HubFull:
+        return
+
+    try:
+        yield "retry: 5000\n\n"
+
+        if backlog is None:
+            # Can't replay from Last-Event-ID: client refetches the list once
+            yield _sse_frame("reset", {}, hub.last_event_id())
+        else:
+            for event_id, row in backlog:
+                yield _sse_frame("notification", row, event_id)
+
+        while True:
+            timeout = SSE_PING_S
+            if expires_at is not None:
+                timeout = min(timeout, expires_at - time.time())
+                if timeout <= 0:
+                    # Token expired: client reconnects with a fresh one
+                    yield _sse_frame("expired", {})
+                    return
+
+            try:
+                event_id, row = await asyncio.wait_for(sub.queue.get(), timeout)
+            except asyncio.TimeoutError:
+                yield ": ping\n\n"
+                continue
+
+            if sub.overflowed:
+                # Fell behind: skip the backlog, tell the client to refetch
+                while not sub.queue.empty():
+                    sub.queue.get_nowait()
+                sub.overflowed = False
+                yield _sse_frame("reset", {}, hub.last_event_id())
+                continue
+
+            yield _sse_frame("notification", row, event_id)
+    finally:
+        hub.unsubscribe(sub)
+
+
+@router.get("/stream")
+async def stream_notifications(request: Request, user=Depends(get_current_user)):
+    """
+    Server-Sent Events: `notification` for each new row, `reset` when the
+    client should refetch GET /notifications, `expired` when the token does.
+    Resume with the standard Last-Event-ID header.
+    """
+    user_id = str(user["id"])
+
+    try:
+        hub.check_capacity(user_id)
+    except HubFull as e:
+        raise HTTPException(
+            status_code=503,
+            detail={"code": "STREAM_LIMIT", "message": str(e)},
+            headers={"Retry-After": "30"},
+        )
+
+    exp = user.get("exp")
+    return StreamingResponse(
+        _sse_events(user_id, request.headers.get("last-event-id"), float(exp) if exp else None),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.post("/{notification_id}/read")
-def mark_read(notification_id: UUID, user=Depends(get_current_user)):
+async def mark_read(notification_id: UUID, user=Depends(get_current_user)):
     token = user.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail={"code": 
@@ -64,13 +161,15 @@ def mark_read(notification_id: UUID, user=Depends(get_current_user)):
     supa = get_supabase_for_user(token)
 
     try:
-        r = (
+        r = await execute(
             supa.table("notifications")
             .update({"is_read": True})
             .eq("id", str(notification_id))
             .eq("user_id", str(user["id"]))
-            .execute()
         )
+        # `updated` also counts an already-read row (unchanged API), so the
+        # cached badge can't be decremented from it
+        forget_unread(user["id"])
         return {"ok": True, "updated": len(r.data or [])}
 
     except APIError as e:
@@ -78,7 +177,7 @@ def mark_read(notification_id: UUID, user=Depends(get_current_user)):
 
 
 @router.post("/read_for_event/{event_id}")
-def mark_read_for_event(event_id: UUID, user=Depends(get_current_user)):
+async def mark_read_for_event(event_id: UUID, user=Depends(get_current_user)):
     token = user.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail={"code": 
@@ -86,22 +185,23 @@ def mark_read_for_event(event_id: UUID, user=Depends(get_current_user)):
     supa = get_supabase_for_user(token)
 
     try:
-        r = (
+        r = await execute(
             supa.table("notifications")
             .update({"is_read": True})
             .eq("user_id", str(user["id"]))
             .eq("event_id", str(event_id))
             .eq("is_read", False)
-            .execute()
         )
-        return {"ok": True, "updated": len(r.data or [])}
+        updated = len(r.data or [])
+        add_unread([user["id"]], -updated)
+        return {"ok": True, "updated": updated}
 
     except APIError as e:
         raise_http_for_api_error(e)
 
 
 @router.post("/clear")
-def clear_notifications(user=Depends(get_current_user)):
+async def clear_notifications(user=Depends(get_current_user)):
     token = user.get("access_token")
     if not token:
         raise HTTPException(status_code=401, detail={"code": 
@@ -110,13 +210,13 @@ def clear_notifications(user=Depends(get_current_user)):
 
     try:
         # "Clear" = mark all read (safer than delete)
-        r = (
+        r = await execute(
             supa.table("notifications")
             .update({"is_read": True})
             .eq("user_id", str(user["id"]))
             .eq("is_read", False)
-            .execute()
         )
+        set_unread(user["id"], 0)
         return {"ok": True, "updated": len(r.data or [])}
 
     except APIError as e:
@@ -1,14 +1,18 @@
 # app/routes/profiles.py
 
+import asyncio
+import time
 from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from postgrest.exceptions import APIError
 
 from app.auth import get_current_user
+from app.coalesce import read_rpc
 from app.http_errors import raise_http_for_api_error
+from app.profile_cache import get_cached_profile, put_cached_profile
 from app.supabase_client import supabase_admin
-from app.supabase_user_client import get_supabase_for_user
+from app.supabase_user_client import execute, get_supabase_for_user
 
 router = APIRouter(prefix="/profiles", tags=["profiles"])
 
@@ -29,17 +33,25 @@ def _get_supabase(current_user: dict):
 # -------------------------------------------------
 
 @router.get("/{user_id}")
-def get_profile(user_id: UUID, current_user=Depends(get_current_user)):
-    supabase = _get_supabase(current_user)
+async def get_profile(user_id: UUID, current_user=Depends(get_current_user)):
+    cached = get_cached_profile(current_user.get("id"), user_id)
+    if cached is not None:
+        return cached
 
-    # -------- Public profile --------
-    try:
-        res = supabase.rpc(
-            "get_public_profile",
-            {"p_user_id": str(user_id)},
-        ).execute()
-    except APIError as e:
-        raise_http_for_api_error(e)
+    supabase = _get_supabase(current_user)
+    fetched_since = time.monotonic()
+
+    # Public profile + stats (hosted / played) in parallel: one round trip of latency
+    res, stats_res = await asyncio.gather(
+        read_rpc(supabase, current_user, "get_public_profile", {"p_user_id": str(user_id)}),
+        read_rpc(supabase, current_user, "get_profile_stats", {"p_user_id": str(user_id)}),
+        return_exceptions=True,
+    )
+    for r in (res, stats_res):
+        if isinstance(r, APIError):
+            raise_http_for_api_error(r)
+        if isinstance(r, BaseException):
+            raise r
 
     data = res.data
     if not data:
@@ -50,15 +62,6 @@ def get_profile(user_id: UUID, current_user=Depends(get_current_user)):
 
     profile = data[0]
 
-    # -------- Profile stats (hosted / played) --------
-    try:
-        stats_res = supabase.rpc(
-            "get_profile_stats",
-            {"p_user_id": str(user_id)},
-        ).execute()
-    except APIError as e:
-        raise_http_for_api_error(e)
-
     stats_row = None
     if getattr(stats_res, "data", None):
         stats_row = (
@@ -70,6 +73,7 @@ def get_profile(user_id: UUID, current_user=Depends(get_current_user)):
     profile["hosted_count"] = int((stats_row or {}).get("hosted_count") or 0)
     profile["played_count"] = int((stats_row or {}).get("played_count") or 0)
 
+    put_cached_profile(current_user.get("id"), user_id, profile, fetched_since)
     return profile
 
 
@@ -78,7 +82,7 @@ def get_profile(user_id: UUID, current_user=Depends(get_current_user)):
 # -------------------------------------------------
 
 @router.get("/{user_id}/decks")
-def get_profile_decks(user_id: UUID, current_user=Depends(get_current_user)):
+async def get_profile_decks(user_id: UUID, current_user=Depends(get_current_user)):
     """
     Public decks for a profile page.
     NOTE: Public read only. Editing lives in /me/decks.
@@ -86,7 +90,7 @@ def get_profile_decks(user_id: UUID, current_user=Depends(get_current_user)):
     supabase = _get_supabase(current_user)
 
     try:
-        res = (
+        res = await execute(
             supabase.table("decks")
             .select(
                 "id,"
@@ -106,7 +110,6 @@ def get_profile_decks(user_id: UUID, current_user=Depends(get_current_user)):
             )
             .eq("user_id", str(user_id))
             .order("updated_at", desc=True)
-            .execute()
         )
     except APIError as e:
         raise_http_for_api_error(e)
@@ -1,43 +1,48 @@
-from supabase import create_client, Client
-import logging
-from typing import Optional
+import threading
+from typing import Any, Optional
 
+# Required config is validated once, in app.config (fail fast, fail loud)
 from app.config import (
     SUPABASE_URL,
     SUPABASE_SERVICE_ROLE_KEY,
-    SUPABASE_ANON_KEY,
 )
 
-logger = logging.getLogger("untapgo")
+# -------------------------------------------------
+# Service role client (admin / server-side only)
+# Built on first use: importing `supabase` pulls in the GoTrue, storage,
+# realtime and functions stacks, which used to run on every cold start
+# before the first request could be served.
+# -------------------------------------------------
+_admin: Optional[Any] = None
+_admin_lock = threading.Lock()
 
 
-def _require_env(name: str, value: Optional[str]) -> str:
-    if value is None or str(value).strip() == "":
-        # This will be caught by the global exception handler in main.py
-        msg = f"Missing required config: {name}. Did you source .env?"
-        logger.error(msg)
-        raise RuntimeError(msg)
-    return value
+def get_supabase_admin() -> Any:
+    global _admin
+    if _admin is None:
+        with _admin_lock:
+            if _admin is None:
+                from supabase import create_client
 
+                _admin = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+    return _admin
 
-# Validate required config at import time (fail fast, fail loud)
-SUPABASE_URL = _require_env("SUPABASE_URL", SUPABASE_URL)
-SUPABASE_SERVICE_ROLE_KEY = _require_env(
-    "SUPABASE_SERVICE_ROLE_KEY", SUPABASE_SERVICE_ROLE_KEY
-)
-SUPABASE_ANON_KEY = _require_env("SUPABASE_ANON_KEY", SUPABASE_ANON_KEY)
 
-# -------------------------------------------------
-# Service role client (admin / server-side only)
-# -------------------------------------------------
-supabase = create_client(SUPABASE_URL, SUPABASE_SERVICE_ROLE_KEY)
+class _LazyAdminClient:
+    """Stands in for the admin client at import sites (`supabase_admin.table(...)`)."""
+
+    __slots__ = ()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(get_supabase_admin(), name)
+
+
+supabase = _LazyAdminClient()
 supabase_admin = supabase
 
 # -------------------------------------------------
 # User-scoped client (uses anon key + user access token)
 # Needed for RLS / auth.uid()
+# Lives in supabase_user_client on top of the shared connection pool.
 # -------------------------------------------------
-def get_supabase_for_user(access_token: str) -> Client:
-    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
-    client.postgrest.auth(access_token)
-    return client
+from app.supabase_user_client import get_supabase_for_user  # noqa: E402,F401
@@ -1,11 +1,155 @@
-from supabase import create_client
-from app.config import SUPABASE_URL, SUPABASE_ANON_KEY
+import inspect
+import threading
+from typing import Any, Dict, Optional, Union
 
-def get_supabase_for_user(access_token: str):
-    client = create_client(SUPABASE_URL, SUPABASE_ANON_KEY)
+import httpx
+from fastapi.concurrency import run_in_threadpool
+from postgrest import AsyncPostgrestClient, SyncPostgrestClient
+
+from app import metrics
+from app.config import (
+    SUPABASE_URL,
+    SUPABASE_ANON_KEY,
+    SUPABASE_ASYNC,
+    SUPABASE_HTTP2,
+    SUPABASE_TIMEOUT_S,
+    SUPABASE_POOL_MAX_CONNECTIONS,
+    SUPABASE_POOL_MAX_KEEPALIVE,
+    SUPABASE_POOL_KEEPALIVE_EXPIRY_S,
+)
+
+REST_URL = f"{SUPABASE_URL.rstrip('/')}/rest/v1"
+
+# -------------------------------------------------
+# Shared transports (one keep-alive pool for the whole process)
+# create_client() per request used to build GoTrue/storage/realtime plus a
+# brand new connection pool, so every request paid a TCP/TLS handshake.
+# -------------------------------------------------
+_transport: Optional[httpx.HTTPTransport] = None
+_async_transport: Optional[httpx.AsyncHTTPTransport] = None
+_transport_lock = threading.Lock()
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=SUPABASE_POOL_MAX_CONNECTIONS,
+        max_keepalive_connections=SUPABASE_POOL_MAX_KEEPALIVE,
+        keepalive_expiry=SUPABASE_POOL_KEEPALIVE_EXPIRY_S,
+    )
+
+
+def _get_transport() -> httpx.HTTPTransport:
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = httpx.HTTPTransport(
+                    http2=SUPABASE_HTTP2,
+                    limits=_pool_limits(),
+                )
+    return _transport
+
+
+def _get_async_transport() -> httpx.AsyncHTTPTransport:
+    # Only touched from the event loop, no lock needed
+    global _async_transport
+    if _async_transport is None:
+        _async_transport = httpx.AsyncHTTPTransport(
+            http2=SUPABASE_HTTP2,
+            limits=_pool_limits(),
+        )
+    return _async_transport
+
+
+def init_user_client_pool() -> None:
+    if SUPABASE_ASYNC:
+        _get_async_transport()
+    else:
+        _get_transport()
+
+
+async def close_user_client_pool() -> None:
+    global _transport, _async_transport
+    if _async_transport is not None:
+        await _async_transport.aclose()
+        _async_transport = None
+    with _transport_lock:
+        if _transport is not None:
+            _transport.close()
+            _transport = None
+
+
+def _user_headers(access_token: str) -> Dict[str, str]:
+    return {
+        "apikey": SUPABASE_ANON_KEY,
+        "Authorization": f"Bearer {access_token}",
+    }
+
+
+def get_supabase_for_user(
+    access_token: str,
+) -> Union[AsyncPostgrestClient, SyncPostgrestClient]:
+    t0 = metrics.now()
+    try:
+        return _build_user_client(access_token)
+    finally:
+        metrics.span("client", metrics.now() - t0)
+
+
+def _build_user_client(
+    access_token: str,
+) -> Union[AsyncPostgrestClient, SyncPostgrestClient]:
+    headers = _user_headers(access_token)
+
+    # Thin per-request wrapper: only the headers are per user, the pool is
+    # shared. Never close this client, it would close the shared transport.
+    if SUPABASE_ASYNC:
+        http_client = httpx.AsyncClient(
+            base_url=REST_URL,
+            headers=headers,
+            timeout=SUPABASE_TIMEOUT_S,
+            transport=_get_async_transport(),
+            trust_env=False,
+            follow_redirects=True,
+        )
+        return AsyncPostgrestClient(REST_URL, headers=headers, http_client=http_client)
+
+    http_client = httpx.Client(
+        base_url=REST_URL,
+        headers=headers,
+        timeout=SUPABASE_TIMEOUT_S,
+        transport=_get_transport(),
+        trust_env=False,
+        follow_redirects=True,
+    )
 
     # Inyecta el JWT del usuario para que PostgREST/RPC vean auth.uid()
-    client.postgrest.auth(access_token)
+    return SyncPostgrestClient(REST_URL, headers=headers, http_client=http_client)
+
+
+async def execute(query) -> Any:
+    """
+    Run a PostgREST query builder from an async route.
+    Async builders are awaited on the loop; sync ones (SUPABASE_ASYNC=0 and
+    the service-role client) go to the threadpool so they never block it.
+    Every call is timed here (app.metrics), by RPC name or table + method.
+    """
+    name = metrics.call_name(query)
+    t0 = metrics.now()
+    ok = False
+    try:
+        if inspect.iscoroutinefunction(query.execute):
+            res = await query.execute()
+        else:
+            started = [t0]
 
-    return client
+            def run() -> Any:
+                started[0] = metrics.now()
+                return query.execute()
 
+            res = await run_in_threadpool(run)
+            metrics.threadpool_wait.observe(started[0] - t0)
+        ok = True
+        return res
+    finally:
+        metrics.observe_upstream(name, metrics.now() - t0, ok)
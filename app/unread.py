@@ -0,0 +1,67 @@
+import time
+from typing import Any, Iterable
+
+from cachetools import TTLCache
+
+from app.config import UNREAD_COUNT_CACHE_SIZE, UNREAD_COUNT_TTL_S
+from app.supabase_user_client import execute
+
+# user id -> unread notifications. Seeded by one count=exact query, then kept
+# current by the code paths that create / read notifications. The short TTL
+# bounds drift from writes this process doesn't see: the Flutter client marks
+# rows read directly in Supabase, other machines and database-side triggers
+# insert rows. GET /notifications always recounts (fresh=True).
+_counts: TTLCache = TTLCache(maxsize=UNREAD_COUNT_CACHE_SIZE, ttl=UNREAD_COUNT_TTL_S)
+
+# user id -> when their unread set last changed, so a count query that was
+# already running can't cache a total missing that change. Outlives a slow
+# count query even when the counter TTL is only a few seconds.
+_changed_at: TTLCache = TTLCache(maxsize=UNREAD_COUNT_CACHE_SIZE, ttl=max(UNREAD_COUNT_TTL_S, 60.0))
+
+
+def _touch(uid: str) -> None:
+    _changed_at[uid] = time.monotonic()
+
+
+async def unread_count(supa, user_id: Any, fresh: bool = False) -> int:
+    uid = str(user_id)
+    n = None if fresh else _counts.get(uid)
+    if n is not None:
+        return n
+
+    started = time.monotonic()
+    c = await execute(
+        supa.table("notifications")
+        .select("id", count="exact")
+        .eq("user_id", uid)
+        .eq("is_read", False)
+        .limit(1)
+    )
+    n = int(getattr(c, "count", 0) or 0)
+    if _changed_at.get(uid, float("-inf")) >= started:
+        # Created / read while counting: n may or may not include it, so
+        # don't cache it; the next read counts again
+        return n
+    _counts[uid] = n
+    return n
+
+
+def add_unread(user_ids: Iterable[Any], n: int = 1) -> None:
+    """Only adjusts users that are already cached; others get counted on next read."""
+    for uid in user_ids:
+        uid = str(uid)
+        _touch(uid)
+        cur = _counts.get(uid)
+        if cur is not None:
+            _counts[uid] = max(0, cur + n)
+
+
+def set_unread(user_id: Any, n: int) -> None:
+    _touch(str(user_id))
+    _counts[str(user_id)] = max(0, n)
+
+
+def forget_unread(user_id: Any) -> None:
+    """Drop the cached count when the change size is unknown; recounted on next read."""
+    _touch(str(user_id))
+    _counts.pop(str(user_id), None)
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark: per-row haversine loop (old /events code path) vs the
+batch kernel in app.geo, with and without NumPy.
+
+    python -m bench.bench_distance [--repeat 5]
+"""
+import argparse
+import random
+import time
+from typing import Any, Callable, Dict, List
+
+from app import geo
+from app.geo import _batch_haversine_py, batch_haversine_km, haversine_km, radius_argsort
+
+SIZES = (1_000, 10_000, 100_000)
+ORIGIN = (59.33, 18.07)
+RADIUS_KM = 50.0
+
+
+def _rows(n: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(n)
+    rows = []
+    for i in range(n):
+        # ~5% of events have no location, like the real feed
+        if rnd.random() < 0.05:
+            rows.append({"id": i, "lat": None, "lng": None})
+        else:
+            rows.append({"id": i, "lat": rnd.uniform(55.0, 69.0), "lng": rnd.uniform(11.0, 24.0)})
+    return rows
+
+
+def per_row_loop(rows: List[Dict[str, Any]]) -> List[int]:
+    lat, lng = ORIGIN
+    out = []
+    for e in rows:
+        ev_lat = e.get("lat")
+        ev_lng = e.get("lng")
+        if ev_lat is None or ev_lng is None:
+            continue
+        try:
+            dist = haversine_km(float(lat), float(lng), float(ev_lat), float(ev_lng))
+        except Exception:
+            continue
+        if dist <= RADIUS_KM:
+            out.append((dist, e["id"]))
+    out.sort(key=lambda x: x[0])
+    return [i for _, i in out]
+
+
+def _batch(kernel: Callable) -> Callable:
+    def run(rows: List[Dict[str, Any]]) -> List[int]:
+        d = kernel(ORIGIN[0], ORIGIN[1], [e.get("lat") for e in rows], [e.get("lng") for e in rows])
+        return [rows[i]["id"] for i in radius_argsort(d, RADIUS_KM)]
+    return run
+
+
+def _best_of(fn: Callable, rows: List[Dict[str, Any]], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(rows)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    cases = [("per_row_loop", per_row_loop)]
+    if geo.preload():
+        cases.append(("batch_numpy", _batch(batch_haversine_km)))
+    cases.append(("batch_python", _batch(_batch_haversine_py)))
+
+    print(f"{'n':>8}  " + "  ".join(f"{name:>14}" for name, _ in cases) + "   (best of %d, ms)" % args.repeat)
+    for n in SIZES:
+        rows = _rows(n)
+        expected = per_row_loop(rows)
+        timings = []
+        for name, fn in cases:
+            if fn(rows) != expected:
+                raise SystemExit(f"{name} disagrees with per_row_loop at n={n}")
+            timings.append(_best_of(fn, rows, args.repeat))
+        print(f"{n:>8}  " + "  ".join(f"{t:>14.2f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Micro-benchmark: feed response encoding, FastAPI's response_model path
+(validate against EventOut, dump to JSON-able Python, stdlib json) vs
+app.fastjson (mapped rows straight to bytes, orjson when installed).
+
+    python -m bench.bench_serialize [--n 5000] [--repeat 5]
+"""
+import argparse
+import json
+import os
+import random
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Union
+
+# app.config insists on these; nothing here talks to Supabase
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench")
+
+from pydantic import TypeAdapter  # noqa: E402
+
+from app import fastjson  # noqa: E402
+from app.routes.events import EventOut, EventPage, _event_out_from_row  # noqa: E402
+
+FEED_MODEL = TypeAdapter(Union[List[EventOut], EventPage])
+
+
+def _feed(n: int) -> List[Dict[str, Any]]:
+    rnd = random.Random(n)
+    hosts = [str(uuid.UUID(int=rnd.getrandbits(128))) for _ in range(200)]
+    rows = []
+    for i in range(n):
+        rows.append({
+            "id": str(uuid.UUID(int=rnd.getrandbits(128))),
+            "title": f"Commander night #{i}",
+            "format_slug": rnd.choice(["commander", "modern", "pauper", "cedh"]),
+            "address_text": f"Street {i}, City",
+            "place_id": f"place-{i}",
+            "lat": rnd.uniform(55.0, 69.0),
+            "lng": rnd.uniform(11.0, 24.0),
+            "starts_at": f"2026-0{rnd.randint(1, 9)}-1{rnd.randint(0, 9)}T18:00:00+00:00",
+            "duration_minutes": 180,
+            "max_players": 4,
+            "status": "Open",
+            "power_level": "7",
+            "proxies_policy": "allowed",
+            "host_notes": "Bring sleeves." if i % 3 else None,
+            "host_user_id": rnd.choice(hosts),
+            "host_nickname": "host",
+            "joined_count": rnd.randint(0, 4),
+            "is_joined": False,
+            "pending_requests_count": 0,
+            "my_status": None,
+            "cooldown_seconds": None,
+        })
+    return [_event_out_from_row(e, using_user_feed=True) for e in rows]
+
+
+def response_model_path(content: Any) -> bytes:
+    # What FastAPI does for a route with response_model and a plain return value
+    value = FEED_MODEL.validate_python(content)
+    data = FEED_MODEL.dump_python(value, mode="json")
+    return json.dumps(data, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def fast_path(content: Any) -> bytes:
+    return fastjson.dumps(content)
+
+
+def _best_of(fn: Callable[[Any], bytes], content: Any, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - t0)
+    return best * 1000.0
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--n", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    items = _feed(args.n)
+    payloads = [("list", items), ("page", {"items": items, "next_cursor": "abc"})]
+    encoder = "orjson" if fastjson.orjson is not None else "stdlib json"
+
+    print(f"n={args.n}, fast path encoder: {encoder} (best of {args.repeat}, ms)")
+    print(f"{'shape':>6}  {'response_model':>14}  {'fast':>8}  {'speedup':>7}  {'bytes':>9}")
+    for shape, content in payloads:
+        strict_body = response_model_path(content)
+        fast_body = fast_path(content)
+        if json.loads(strict_body) != json.loads(fast_body):
+            raise SystemExit(f"fast path output differs from response_model output ({shape})")
+
+        t_strict = _best_of(response_model_path, content, args.repeat)
+        t_fast = _best_of(fast_path, content, args.repeat)
+        print(f"{shape:>6}  {t_strict:>14.2f}  {t_fast:>8.2f}  {t_strict / t_fast:>6.1f}x  {len(fast_body):>9}")
+
+
+if __name__ == "__main__":
+    main()
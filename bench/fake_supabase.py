@@ -0,0 +1,247 @@
+"""
+In-process stand-in for the Supabase REST API (PostgREST), for bench/.
+
+Serves the RPCs and tables the app calls from a generated dataset, through
+httpx.MockTransport, so the real routes, clients and middleware run with no
+network. Every response can be delayed to mimic the round trip to Supabase.
+"""
+import asyncio
+import bisect
+import json
+import random
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+FORMATS = ("commander", "modern", "pauper", "cedh", "standard", "pioneer")
+CITIES = (
+    ("Stockholm", 59.33, 18.07, 40_000),
+    ("Gothenburg", 57.71, 11.97, 30_000),
+    ("Malmo", 55.60, 13.00, 25_000),
+    ("Uppsala", 59.86, 17.64, 20_000),
+)
+
+
+def _uuid(rnd: random.Random) -> str:
+    return str(uuid.UUID(int=rnd.getrandbits(128), version=4))
+
+
+class Dataset:
+    """Events, users and memberships, deterministic for a given seed."""
+
+    def __init__(self, n_events: int, n_users: int, seed: int = 1):
+        rnd = random.Random(seed)
+        now = datetime.now(timezone.utc).replace(microsecond=0)
+
+        self.user_ids = [_uuid(rnd) for _ in range(n_users)]
+        self.formats = [{"id": i + 1, "slug": s} for i, s in enumerate(FORMATS)]
+        self.cities = [
+            {"id": i + 1, "name": n, "center_lat": lat, "center_lng": lng, "radius_m": r}
+            for i, (n, lat, lng, r) in enumerate(CITIES)
+        ]
+
+        self.events: List[Dict[str, Any]] = []
+        self.memberships: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_event: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+        for i in range(n_events):
+            _, clat, clng, _ = rnd.choice(CITIES)
+            host = rnd.choice(self.user_ids)
+            max_players = rnd.choice((4, 4, 4, 6, 8))
+            joined = rnd.randint(0, max_players - 1)
+            eid = _uuid(rnd)
+            self.events.append({
+                "id": eid,
+                "title": f"Game night #{i}",
+                "format_slug": rnd.choice(FORMATS),
+                "address_text": f"Street {i}",
+                "place_id": f"place-{i}",
+                "lat": clat + rnd.uniform(-0.4, 0.4),
+                "lng": clng + rnd.uniform(-0.6, 0.6),
+                "starts_at": (now + timedelta(minutes=rnd.randint(30, 60 * 24 * 30))).isoformat(),
+                "duration_minutes": 180,
+                "max_players": max_players,
+                "status": "Open",
+                "power_level": str(rnd.randint(1, 10)),
+                "proxies_policy": "allowed",
+                "host_notes": None,
+                "host_user_id": host,
+                "host_nickname": f"user-{host[:6]}",
+                "joined_count": joined,
+                "is_joined": False,
+                "pending_requests_count": rnd.randint(0, 2),
+                "my_status": None,
+                "cooldown_seconds": None,
+            })
+            for uid in rnd.sample(self.user_ids, min(joined, len(self.user_ids))):
+                m = {"event_id": eid, "user_id": uid, "status": "joined", "cooldown_until": None}
+                self.memberships[uid].append(m)
+                self.by_event[eid].append(m)
+
+        self.events.sort(key=lambda e: (e["starts_at"], e["id"]))
+        self.by_id = {e["id"]: e for e in self.events}
+        self._sort_keys = [(e["starts_at"], e["id"]) for e in self.events]
+        self.hosts: Dict[str, List[str]] = defaultdict(list)
+        for e in self.events:
+            self.hosts[e["host_user_id"]].append(e["id"])
+
+    def page_after(self, after: Optional[Tuple[str, str]], limit: Optional[int]) -> List[Dict[str, Any]]:
+        start = bisect.bisect_right(self._sort_keys, after) if after else 0
+        end = len(self.events) if limit is None else start + limit
+        return self.events[start:end]
+
+
+def _eq(params: httpx.QueryParams, col: str) -> Optional[str]:
+    v = params.get(col)
+    return v[3:] if v and v.startswith("eq.") else None
+
+
+class FakeSupabase:
+    """
+    Request handler for httpx.MockTransport. `latency_s` (+/- `jitter_s`) is
+    added to every call; `calls` counts them by RPC name / table + method.
+    """
+
+    def __init__(self, data: Dataset, latency_s: float = 0.0, jitter_s: float = 0.0, seed: int = 1):
+        self.data = data
+        self.latency_s = latency_s
+        self.jitter_s = jitter_s
+        self.calls: Counter = Counter()
+        self._rnd = random.Random(seed)
+        self._lock = threading.Lock()  # sync handler runs on threadpool workers
+        self._feed_body = json.dumps(data.events, separators=(",", ":")).encode("utf-8")
+        self._notif_counts: Dict[str, int] = defaultdict(int)
+
+    # ---------------- transports ----------------
+
+    def async_transport(self) -> httpx.MockTransport:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            await asyncio.sleep(self._delay())
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def sync_transport(self) -> httpx.MockTransport:
+        def handler(request: httpx.Request) -> httpx.Response:
+            time.sleep(self._delay())
+            return self.handle(request)
+        return httpx.MockTransport(handler)
+
+    def _delay(self) -> float:
+        if not self.jitter_s:
+            return self.latency_s
+        with self._lock:
+            return max(0.0, self.latency_s + self._rnd.uniform(-self.jitter_s, self.jitter_s))
+
+    # ---------------- routing ----------------
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/rest/v1/", 1)[-1].strip("/")
+        method = request.method
+        if path.startswith("rpc/"):
+            name = path[4:]
+            with self._lock:
+                self.calls["rpc:" + name] += 1
+            body = json.loads(request.content or b"{}") if method == "POST" else dict(request.url.params)
+            fn = getattr(self, "rpc_" + name, None)
+            if fn is None:
+                return httpx.Response(200, json={"ok": True})
+            return fn(body)
+
+        with self._lock:
+            self.calls[f"{method} {path}"] += 1
+        fn = getattr(self, f"{method.lower()}_{path}", None)
+        if fn is None:
+            return httpx.Response(200, json=[])
+        return fn(request)
+
+    # ---------------- RPCs ----------------
+
+    def rpc_get_events_feed(self, p: Dict[str, Any]) -> httpx.Response:
+        if "p_lat" in p:
+            # Radius pushdown: rough bounding box, the app does the exact cut
+            dlat = float(p["p_radius_km"]) / 111.0
+            rows = [
+                e for e in self.data.events
+                if abs(e["lat"] - float(p["p_lat"])) <= dlat and abs(e["lng"] - float(p["p_lng"])) <= dlat * 2
+            ]
+            return httpx.Response(200, json=rows)
+        if "p_limit" in p:
+            after = (p["p_after_starts_at"], p["p_after_id"]) if p.get("p_after_id") else None
+            return httpx.Response(200, json=self.data.page_after(after, int(p["p_limit"])))
+        return httpx.Response(200, content=self._feed_body, headers={"content-type": "application/json"})
+
+    def rpc_get_events(self, p: Dict[str, Any]) -> httpx.Response:
+        return self.rpc_get_events_feed(p)
+
+    def rpc_get_my_events(self, p: Dict[str, Any]) -> httpx.Response:
+        uid = p.get("p_user_id")
+        ids = set(self.data.hosts.get(uid, ())) | {m["event_id"] for m in self.data.memberships.get(uid, ())}
+        return httpx.Response(200, json=[self.data.by_id[i] for i in ids if i in self.data.by_id])
+
+    def rpc_get_event(self, p: Dict[str, Any]) -> httpx.Response:
+        e = self.data.by_id.get(p.get("p_event_id"))
+        return httpx.Response(200, json=[e] if e else [])
+
+    def rpc_get_event_attendees(self, p: Dict[str, Any]) -> httpx.Response:
+        rows = [
+            {"user_id": m["user_id"], "nickname": f"user-{m['user_id'][:6]}", "status": m["status"]}
+            for m in self.data.by_event.get(p.get("p_event_id"), ())
+        ]
+        return httpx.Response(200, json=rows)
+
+    def rpc_get_event_requests(self, p: Dict[str, Any]) -> httpx.Response:
+        return httpx.Response(200, json=[])
+
+    def rpc_get_public_profile(self, p: Dict[str, Any]) -> httpx.Response:
+        uid = p.get("p_user_id")
+        return httpx.Response(200, json=[{"id": uid, "nickname": f"user-{str(uid)[:6]}", "bio": None}])
+
+    def rpc_get_profile_stats(self, p: Dict[str, Any]) -> httpx.Response:
+        uid = p.get("p_user_id")
+        return httpx.Response(200, json=[{
+            "hosted_count": len(self.data.hosts.get(uid, ())),
+            "played_count": len(self.data.memberships.get(uid, ())),
+        }])
+
+    # ---------------- tables ----------------
+
+    def get_event_memberships(self, request: httpx.Request) -> httpx.Response:
+        uid = _eq(request.url.params, "user_id")
+        eid = _eq(request.url.params, "event_id")
+        if uid:
+            return httpx.Response(200, json=self.data.memberships.get(uid, []))
+        if eid:
+            return httpx.Response(200, json=self.data.by_event.get(eid, []))
+        return httpx.Response(200, json=[])
+
+    def get_events(self, request: httpx.Request) -> httpx.Response:
+        e = self.data.by_id.get(_eq(request.url.params, "id") or "")
+        return httpx.Response(200, json=[e] if e else [])
+
+    def get_formats(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=self.data.formats)
+
+    def get_cities(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=self.data.cities)
+
+    def get_notifications(self, request: httpx.Request) -> httpx.Response:
+        uid = _eq(request.url.params, "user_id") or ""
+        with self._lock:
+            n = self._notif_counts[uid]
+        headers = {"content-range": f"*/{n}"}
+        return httpx.Response(200, json=[], headers=headers)
+
+    def post_notifications(self, request: httpx.Request) -> httpx.Response:
+        rows = json.loads(request.content or b"[]")
+        with self._lock:
+            for r in rows if isinstance(rows, list) else [rows]:
+                self._notif_counts[r.get("user_id", "")] += 1
+        return httpx.Response(201, content=b"")
+
+    def patch_notifications(self, request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json=[])
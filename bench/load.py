@@ -0,0 +1,304 @@
+"""
+Load test: the real FastAPI app, in-process, against bench.fake_supabase.
+
+No network and no Supabase project needed: the user and service-role
+PostgREST clients are pointed at an httpx.MockTransport serving a generated
+dataset, and bearer tokens are signed with a locally seeded JWKS key.
+
+    python -m bench.load [--events 10000] [--users 5000] [--latency-ms 20]
+                         [--jitter-ms 5] [--concurrency 32] [--requests 3000]
+                         [--mix default] [--out bench/results/load.json]
+
+App feature flags (FEED_CATALOG_CACHE=1, SUPABASE_ASYNC=0, ...) are read from
+the environment as usual and recorded in the JSON report.
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+# Before any app import: app.config validates these at import time
+os.environ.setdefault("SUPABASE_URL", "http://fake-supabase.local")
+os.environ.setdefault("SUPABASE_ANON_KEY", "bench-anon")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-service-role")
+os.environ.setdefault("JOBS_DB_PATH", os.path.join(tempfile.mkdtemp(prefix="untapgo-bench-"), "jobs.sqlite3"))
+
+import httpx  # noqa: E402
+from jose import jwt  # noqa: E402
+from postgrest import SyncPostgrestClient  # noqa: E402
+
+from app import auth, metrics, supabase_client, supabase_user_client  # noqa: E402
+from app.main import app  # noqa: E402
+from bench.fake_supabase import Dataset, FakeSupabase  # noqa: E402
+
+FLAGS = (
+    "SUPABASE_ASYNC", "SUPABASE_HTTP2", "FEED_CATALOG_CACHE", "FEED_RADIUS_PUSHDOWN",
+    "FEED_KEYSET_PUSHDOWN", "COALESCE_READS", "STRICT_RESPONSE_VALIDATION", "JOBS_ENABLED",
+)
+
+_SECRET = b"bench-signing-secret-not-for-production"
+
+MIXES: Dict[str, Dict[str, int]] = {
+    "default": {
+        "feed_refresh": 35,
+        "nearby": 15,
+        "detail": 15,
+        "detail_full": 5,
+        "badge": 10,
+        "profile": 5,
+        "join_leave": 8,
+        "host_accept": 4,
+        "cities": 3,
+    },
+    "read_only": {"feed_refresh": 50, "nearby": 20, "detail": 20, "badge": 10},
+    "writes": {"join_leave": 60, "host_accept": 40},
+}
+
+
+# ---------------- wiring ----------------
+
+def _install_fake(fake: FakeSupabase) -> None:
+    # User-scoped clients are built on these shared transports
+    supabase_user_client._async_transport = fake.async_transport()
+    supabase_user_client._transport = fake.sync_transport()
+
+    # Service-role client: swap its PostgREST client for one on the fake
+    headers = {"apikey": "bench-service-role", "Authorization": "Bearer bench-service-role"}
+    http_client = httpx.Client(
+        base_url=supabase_user_client.REST_URL, headers=headers, transport=fake.sync_transport()
+    )
+    supabase_client.get_supabase_admin()._postgrest = SyncPostgrestClient(
+        supabase_user_client.REST_URL, headers=headers, http_client=http_client
+    )
+
+    auth._jwks.seed({"keys": [{
+        "kty": "oct",
+        "kid": "bench",
+        "alg": "HS256",
+        "k": base64.urlsafe_b64encode(_SECRET).rstrip(b"=").decode("ascii"),
+    }]})
+
+
+def _token(user_id: str) -> str:
+    claims = {
+        "sub": user_id,
+        "aud": auth.JWT_AUD,
+        "iss": auth.JWT_ISSUER,
+        "role": "authenticated",
+        "exp": int(time.time()) + 3600,
+    }
+    return jwt.encode(claims, _SECRET, algorithm="HS256", headers={"kid": "bench"})
+
+
+# ---------------- scenarios ----------------
+
+class Ctx:
+    def __init__(self, client: httpx.AsyncClient, data: Dataset, tokens: Dict[str, str], rnd: random.Random):
+        self.client = client
+        self.data = data
+        self.tokens = tokens
+        self.rnd = rnd
+
+    def user(self) -> str:
+        return self.rnd.choice(self.data.user_ids)
+
+    def event(self) -> Dict[str, Any]:
+        return self.rnd.choice(self.data.events)
+
+    async def get(self, uid: str, url: str) -> int:
+        r = await self.client.get(url, headers={"Authorization": f"Bearer {self.tokens[uid]}"})
+        return r.status_code
+
+    async def post(self, uid: str, url: str, body: Optional[Dict[str, Any]] = None) -> int:
+        r = await self.client.post(url, json=body or {}, headers={"Authorization": f"Bearer {self.tokens[uid]}"})
+        return r.status_code
+
+
+async def feed_refresh(c: Ctx) -> List[int]:
+    e = c.event()
+    return [await c.get(c.user(), f"/events?limit=50&lat={e['lat']:.4f}&lng={e['lng']:.4f}")]
+
+
+async def nearby(c: Ctx) -> List[int]:
+    e = c.event()
+    return [await c.get(c.user(), f"/events/nearby?lat={e['lat']:.4f}&lng={e['lng']:.4f}&radius_km=25&limit=50")]
+
+
+async def detail(c: Ctx) -> List[int]:
+    # What event_detail_screen does today: sequential GETs
+    uid, eid = c.user(), c.event()["id"]
+    return [await c.get(uid, f"/events/{eid}"), await c.get(uid, f"/events/{eid}/attendees")]
+
+
+async def detail_full(c: Ctx) -> List[int]:
+    return [await c.get(c.user(), f"/events/{c.event()['id']}/full")]
+
+
+async def badge(c: Ctx) -> List[int]:
+    return [await c.get(c.user(), "/notifications/unread_count")]
+
+
+async def profile(c: Ctx) -> List[int]:
+    return [await c.get(c.user(), f"/profiles/{c.user()}")]
+
+
+async def join_leave(c: Ctx) -> List[int]:
+    uid, eid = c.user(), c.event()["id"]
+    return [await c.post(uid, f"/events/{eid}/join"), await c.post(uid, f"/events/{eid}/leave")]
+
+
+async def host_accept(c: Ctx) -> List[int]:
+    e = c.event()
+    return [await c.post(e["host_user_id"], f"/events/{e['id']}/accept", {"user_id": c.user()})]
+
+
+async def cities(c: Ctx) -> List[int]:
+    return [await c.get(c.user(), "/cities")]
+
+
+SCENARIOS: Dict[str, Callable[[Ctx], Awaitable[List[int]]]] = {
+    f.__name__: f for f in (feed_refresh, nearby, detail, detail_full, badge, profile, join_leave, host_accept, cities)
+}
+
+
+# ---------------- driver ----------------
+
+def _pct(sorted_ms: List[float], p: float) -> Optional[float]:
+    if not sorted_ms:
+        return None
+    i = min(len(sorted_ms) - 1, max(0, int(round(p / 100.0 * len(sorted_ms) + 0.5)) - 1))
+    return round(sorted_ms[i], 2)
+
+
+async def _run(args: argparse.Namespace) -> Dict[str, Any]:
+    data = Dataset(args.events, args.users, seed=args.seed)
+    fake = FakeSupabase(data, latency_s=args.latency_ms / 1000.0, jitter_s=args.jitter_ms / 1000.0, seed=args.seed)
+    _install_fake(fake)
+    tokens = {uid: _token(uid) for uid in data.user_ids}
+
+    mix = MIXES[args.mix]
+    names = list(mix)
+    weights = [mix[n] for n in names]
+
+    results: List[Tuple[str, float, List[int]]] = []
+    remaining = args.warmup + args.requests
+
+    async with app.router.lifespan_context(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=120) as client:
+
+            async def worker(n: int) -> None:
+                nonlocal remaining
+                ctx = Ctx(client, data, tokens, random.Random(args.seed * 1000 + n))
+                while remaining > 0:
+                    remaining -= 1
+                    warm = remaining >= args.requests
+                    name = ctx.rnd.choices(names, weights)[0]
+                    t0 = time.perf_counter()
+                    statuses = await SCENARIOS[name](ctx)
+                    if not warm:
+                        results.append((name, (time.perf_counter() - t0) * 1000.0, statuses))
+
+            # Warm-up requests run first and are not measured
+            started = time.perf_counter()
+            await asyncio.gather(*(worker(i) for i in range(args.concurrency)))
+            wall = time.perf_counter() - started
+
+    by_name: Dict[str, List[Tuple[float, List[int]]]] = {}
+    for name, ms, statuses in results:
+        by_name.setdefault(name, []).append((ms, statuses))
+
+    scenarios = {}
+    for name, rows in sorted(by_name.items()):
+        lat = sorted(ms for ms, _ in rows)
+        errors = sum(1 for _, st in rows if any(s >= 400 for s in st))
+        scenarios[name] = {
+            "count": len(rows),
+            "errors": errors,
+            "http_requests": sum(len(st) for _, st in rows),
+            "mean_ms": round(sum(lat) / len(lat), 2),
+            "p50_ms": _pct(lat, 50),
+            "p95_ms": _pct(lat, 95),
+            "p99_ms": _pct(lat, 99),
+            "max_ms": round(lat[-1], 2),
+        }
+
+    routes = {}
+    for (route, method), (n, total) in sorted(metrics.http_upstream_calls.totals().items()):
+        if n:
+            routes[f"{method} {route}"] = {"requests": n, "upstream_calls_per_request": round(total / n, 2)}
+
+    all_lat = sorted(ms for _, ms, _ in results)
+    http_requests = sum(len(st) for _, _, st in results)
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+            "flags": {f: os.getenv(f) for f in FLAGS if os.getenv(f) is not None},
+        },
+        "summary": {
+            "wall_s": round(wall, 3),
+            "screens": len(results),
+            "screens_per_s": round(len(results) / wall, 1) if wall else None,
+            "http_requests_per_s": round(http_requests / wall, 1) if wall else None,
+            "p50_ms": _pct(all_lat, 50),
+            "p95_ms": _pct(all_lat, 95),
+            "p99_ms": _pct(all_lat, 99),
+        },
+        "scenarios": scenarios,
+        "routes": routes,
+        "upstream_calls": dict(sorted(fake.calls.items())),
+    }
+
+
+def _print(report: Dict[str, Any]) -> None:
+    s = report["summary"]
+    print(
+        f"{s['screens']} screens in {s['wall_s']}s: {s['screens_per_s']} screens/s, "
+        f"{s['http_requests_per_s']} req/s, p50 {s['p50_ms']} / p95 {s['p95_ms']} / p99 {s['p99_ms']} ms"
+    )
+    print(f"{'scenario':>14} {'count':>7} {'err':>5} {'p50':>9} {'p95':>9} {'p99':>9}")
+    for name, r in report["scenarios"].items():
+        print(f"{name:>14} {r['count']:>7} {r['errors']:>5} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}")
+    print("\nupstream calls per request")
+    for route, r in report["routes"].items():
+        print(f"  {route:<40} {r['upstream_calls_per_request']:>5}  ({r['requests']} req)")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--events", type=int, default=10_000)
+    ap.add_argument("--users", type=int, default=5_000)
+    ap.add_argument("--latency-ms", type=float, default=20.0, help="injected upstream round trip")
+    ap.add_argument("--jitter-ms", type=float, default=5.0)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--requests", type=int, default=3_000, help="measured screens")
+    ap.add_argument("--warmup", type=int, default=200)
+    ap.add_argument("--mix", choices=sorted(MIXES), default="default")
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    args = ap.parse_args()
+
+    report = asyncio.run(_run(args))
+    _print(report)
+
+    if args.out:
+        d = os.path.dirname(args.out)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nreport: {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+Cold start report: import time per module for `app.main`, and time from
+process spawn to the first byte of GET /health from a real uvicorn.
+
+    python -m bench.startup [--runs 5] [--top 25] [--out bench/results/startup.json]
+
+Each measurement runs in a fresh interpreter, the way a Fly machine boots.
+Supabase is not contacted: SUPABASE_URL defaults to a closed local port, so
+the background warm-ups fail quietly and only the boot path is timed.
+"""
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from typing import Any, Dict, List, Optional
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _env() -> Dict[str, str]:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    env.setdefault("SUPABASE_ANON_KEY", "bench-anon")
+    env.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-service-role")
+    env.setdefault("JOBS_ENABLED", "0")
+    env["PYTHONPATH"] = ROOT + os.pathsep + env.get("PYTHONPATH", "")
+    return env
+
+
+def import_times() -> List[Dict[str, Any]]:
+    """Rows of `python -X importtime -c 'import app.main'`, in import order."""
+    p = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=ROOT, env=_env(), capture_output=True, text=True, check=True,
+    )
+    rows = []
+    for line in p.stderr.splitlines():
+        # import time:   self [us] | cumulative | imported package
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append({"module": name.strip(), "depth": depth, "self_ms": int(self_us) / 1000.0, "cumulative_ms": int(cum_us) / 1000.0})
+    return rows
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def time_to_first_byte(timeout_s: float = 60.0) -> Optional[float]:
+    """Spawn uvicorn and poll /health; ms from spawn to the first response."""
+    port = _free_port()
+    t0 = time.perf_counter()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"],
+        cwd=ROOT, env=_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        while time.perf_counter() - t0 < timeout_s:
+            if proc.poll() is not None:
+                return None
+            try:
+                with urllib.request.urlopen(f"http://127.0.0.1:{port}/health", timeout=1) as r:
+                    r.read(1)
+                return (time.perf_counter() - t0) * 1000.0
+            except OSError:
+                time.sleep(0.005)
+        return None
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--top", type=int, default=25)
+    ap.add_argument("--out", default=None, help="write the JSON report here")
+    args = ap.parse_args()
+
+    rows = import_times()
+    total_ms = sum(r["self_ms"] for r in rows)
+
+    # Everything nests under app.main, so cumulative times at depth 0 say
+    # little: charge each module's own time to its top-level package instead
+    by_package: Dict[str, Dict[str, Any]] = {}
+    for r in rows:
+        pkg = by_package.setdefault(r["module"].split(".")[0], {"self_ms": 0.0, "modules": 0})
+        pkg["self_ms"] += r["self_ms"]
+        pkg["modules"] += 1
+    top = sorted(
+        ({"package": name, "self_ms": round(v["self_ms"], 1), "modules": v["modules"]} for name, v in by_package.items()),
+        key=lambda r: r["self_ms"],
+        reverse=True,
+    )[:args.top]
+    # app modules, with what each one pulls in first
+    app_mods = sorted(
+        (r for r in rows if r["module"] == "app" or r["module"].startswith("app.")),
+        key=lambda r: r["cumulative_ms"],
+        reverse=True,
+    )
+
+    ttfb = [t for t in (time_to_first_byte() for _ in range(args.runs)) if t is not None]
+
+    print(f"import app.main: {total_ms:.0f} ms across {len(rows)} modules")
+    print(f"\n{'self':>10} {'modules':>8}  package")
+    for r in top:
+        print(f"{r['self_ms']:>8.1f}ms {r['modules']:>8}  {r['package']}")
+    print(f"\n{'cumulative':>11} {'self':>8}  app module")
+    for r in app_mods:
+        print(f"{r['cumulative_ms']:>9.1f}ms {r['self_ms']:>6.1f}ms  {r['module']}")
+    if ttfb:
+        print(
+            f"\nspawn -> first byte of /health: min {min(ttfb):.0f} ms, "
+            f"median {statistics.median(ttfb):.0f} ms ({len(ttfb)}/{args.runs} runs)"
+        )
+    else:
+        print("\nuvicorn did not answer /health", file=sys.stderr)
+
+    if args.out:
+        report = {
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "args": vars(args),
+            },
+            "import_total_ms": round(total_ms, 1),
+            "packages": top,
+            "app_modules": app_mods,
+            "ttfb_ms": [round(t, 1) for t in ttfb],
+        }
+        d = os.path.dirname(args.out)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nreport: {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()